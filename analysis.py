@@ -0,0 +1,115 @@
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+import argparse
+import classes
+import json
+import numpy as np
+import os
+import random
+import tabulator
+
+MODES = ["bootstrap", "leave_one_out", "ties"]
+
+# set in each worker process by `_attach`
+_worker: dict = {}
+
+def _attach(shm_name: str, shape: tuple[int, int], names: list[str], engine: str, mode: str, seed: int):
+	shm = shared_memory.SharedMemory(name=shm_name)
+	_worker.update(
+		shm=shm, # kept referenced so the mapping outlives the initializer
+		scores=np.ndarray(shape, dtype=np.int8, buffer=shm.buf),
+		names=names,
+		engine=engine,
+		mode=mode,
+		seed=seed
+	)
+
+def _run(runs: range) -> list[list[int]]:
+	'''
+	Tabulates a batch of resampled elections against the shared score matrix of the worker.
+	:param runs: The run numbers, each one seeds its own resample and tie fallbacks.
+	:returns: The column indices of the elected candidates of each run, in order of election.
+	'''
+
+	scores: np.ndarray = _worker["scores"]
+	names: list[str] = _worker["names"]
+	results = []
+
+	for run in runs:
+		seed = _worker["seed"] + run
+		if _worker["mode"] == "bootstrap":
+			resampled = scores[np.random.default_rng(seed).integers(0, len(scores), size=len(scores))]
+		elif _worker["mode"] == "leave_one_out":
+			resampled = np.delete(scores, run % len(scores), axis=0)
+		else:
+			resampled = scores # shared as is, only the tie fallbacks differ between runs
+
+		data = tabulator.tabulate(classes.BallotMatrix(names, resampled), _worker["engine"], rng=random.Random(seed))
+		results.append([c.column for c in data["rounds"].elected])
+
+	return results
+
+def analyze(election: classes.BallotMatrix, runs: int = 1000, mode: str = "bootstrap", seed: int = 0, workers: int | None = None, engine: str = "numpy") -> dict:
+	'''
+	Measures how stable the result of an election is by tabulating many seeded variations of it in parallel.
+	The score matrix is placed in shared memory once, and every worker process maps it instead of receiving a copy.
+	:param election: The validated ballot matrix.
+	:param runs: The number of tabulations. In `"leave_one_out"` mode it is capped to the number of ballots.
+	:param mode: `"bootstrap"` resamples the ballots with replacement, `"leave_one_out"` drops one ballot per run, and `"ties"` keeps the ballots and only reseeds the random tie fallbacks.
+	:param seed: The base seed, run `r` is seeded with `seed + r`.
+	:param workers: The number of worker processes, all cores if not given.
+	:param engine: The tabulation engine to use, one of `tabulator.ENGINES`.
+	:returns: A dictionary with `"runs"`, `"mode"`, `"elected"`: the fraction of runs each candidate was elected in, and `"seats"`: for each candidate, how many runs elected them as the n-th winner.
+	'''
+
+	if mode not in MODES:
+		raise ValueError(f"Unknown analysis mode: {mode} (expected one of {', '.join(MODES)})")
+	if engine not in tabulator.ENGINES:
+		raise ValueError(f"Unknown tabulation engine: {engine} (expected one of {', '.join(tabulator.ENGINES)})")
+
+	# resampling draws individual ballots, so grouped ballots are expanded again
+	scores = np.ascontiguousarray(election.scores if election.counts is None else np.repeat(election.scores, election.counts, axis=0), dtype=np.int8)
+	if mode == "leave_one_out":
+		runs = min(runs, len(scores))
+
+	workers = workers or os.cpu_count() or 1
+	batch = max(1, runs // (workers * 4))
+	batches = [range(start, min(start + batch, runs)) for start in range(0, runs, batch)]
+
+	elected = Counter()
+	seats: dict[int, Counter] = {}
+
+	shm = shared_memory.SharedMemory(create=True, size=max(1, scores.nbytes))
+	try:
+		np.ndarray(scores.shape, dtype=np.int8, buffer=shm.buf)[:] = scores
+
+		with ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=(shm.name, scores.shape, election.names, engine, mode, seed)) as pool:
+			for future in as_completed([pool.submit(_run, runs_) for runs_ in batches]):
+				for order in future.result():
+					elected.update(order)
+					for position, column in enumerate(order, start=1):
+						seats.setdefault(column, Counter())[position] += 1
+	finally:
+		shm.close()
+		shm.unlink()
+
+	return {
+		"runs": runs,
+		"mode": mode,
+		"elected": {name: elected[j] / runs if runs else 0.0 for j, name in enumerate(election.names)},
+		"seats": {name: dict(sorted(seats.get(j, Counter()).items())) for j, name in enumerate(election.names)}
+	}
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Tabulates many resampled variations of a TEA election in parallel and reports how often each candidate wins.")
+	parser.add_argument("file_or_url", help="the spreadsheet file or URL")
+	parser.add_argument("--runs", type=int, default=1000)
+	parser.add_argument("--mode", choices=MODES, default="bootstrap")
+	parser.add_argument("--seed", type=int, default=0)
+	parser.add_argument("--workers", type=int, default=None)
+	parser.add_argument("--engine", choices=tabulator.ENGINES, default="numpy")
+	args = parser.parse_args()
+
+	result = analyze(tabulator.load_election(args.file_or_url), args.runs, args.mode, args.seed, args.workers, args.engine)
+	print(json.dumps(result, indent=4))
@@ -0,0 +1,81 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import argparse
+import cache
+import glob
+import json
+import os
+import sys
+import tabulator
+
+def expand_inputs(patterns: list[str]) -> list[str]:
+	'''
+	:param patterns: Spreadsheet files, URLs, glob patterns or directories, whose `.csv` and `.arrow` files are all taken.
+	:returns: The spreadsheets to tabulate, in the given order and without duplicates.
+	'''
+
+	inputs = []
+	for pattern in patterns:
+		if os.path.isdir(pattern):
+			inputs.extend(sorted(glob.glob(os.path.join(pattern, "*.csv")) + glob.glob(os.path.join(pattern, "*.arrow"))))
+		elif glob.has_magic(pattern) and (matches := sorted(glob.glob(pattern, recursive=True))):
+			inputs.extend(matches)
+		else:
+			inputs.append(pattern) # files and URLs are reported by `tabulate_one` if they do not exist
+	return list(dict.fromkeys(inputs))
+
+def tabulate_one(file_or_url: str, engine: str = "python", use_cache: bool = True) -> dict:
+	'''
+	Loads and tabulates one spreadsheet, catching its errors so one bad election does not stop the batch.
+	:param file_or_url: The filename or Google Sheets document link of the spreadsheet.
+	:param engine: The tabulation engine to use, one of `tabulator.ENGINES`.
+	:param use_cache: Whether to reuse and store results in the default `cache.ElectionCache`.
+	:returns: A JSON-serializable dictionary with `"file"` and either `"error"` or the `"quota"`, `"seats"`, `"rounds"`, `"elected"` and `"disqualified"` of the election.
+	'''
+
+	try:
+		if use_cache:
+			_, data = cache.tabulate_cached(file_or_url, engine)
+		else:
+			data = tabulator.tabulate(tabulator.load_election(file_or_url), engine)
+	except Exception as e:
+		return {"file": file_or_url, "error": str(e)}
+
+	rounds = data["rounds"]
+	return {
+		"file": file_or_url,
+		"quota": data["quota"],
+		"seats": data["seats"],
+		"rounds": len(rounds),
+		"elected": [candidate.name for candidate in rounds.elected],
+		"disqualified": [candidate.name for candidate in rounds[-1].unelected]
+	}
+
+def run(inputs: list[str], engine: str = "python", use_cache: bool = True, workers: int | None = None, out=sys.stdout) -> int:
+	'''
+	Tabulates many spreadsheets across a process pool, writing one JSON line per election as soon as it finishes.
+	:param inputs: The spreadsheets to tabulate.
+	:param engine: The tabulation engine to use, one of `tabulator.ENGINES`.
+	:param use_cache: Whether to reuse and store results in the default `cache.ElectionCache`.
+	:param workers: The number of worker processes, all cores if not given.
+	:param out: The stream the JSON lines are written to.
+	:returns: The number of elections that failed to load or tabulate.
+	'''
+
+	failures = 0
+	with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, max(1, len(inputs)))) as pool:
+		for future in as_completed([pool.submit(tabulate_one, file_or_url, engine, use_cache) for file_or_url in inputs]):
+			result = future.result()
+			failures += "error" in result
+			print(json.dumps(result), file=out, flush=True)
+	return failures
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Tabulates many TEA elections in parallel, printing one JSON line of results per election. Exits with status 1 if any election fails validation.")
+	parser.add_argument("inputs", nargs="+", help="spreadsheet files, URLs, glob patterns or directories of .csv and .arrow files")
+	parser.add_argument("--engine", choices=tabulator.ENGINES, default="python")
+	parser.add_argument("--workers", type=int, default=None)
+	parser.add_argument("--no-cache", action="store_true", help="always load and tabulate from scratch instead of reusing cached results")
+	args = parser.parse_args()
+
+	inputs = expand_inputs(args.inputs)
+	sys.exit(1 if run(inputs, args.engine, not args.no_cache, args.workers) else 0)
@@ -0,0 +1,3 @@
+'''
+Benchmarks for TEAbulator. Run `python -m benchmarks.run --help` or `python -m benchmarks.startup --help` from the repository root.
+'''
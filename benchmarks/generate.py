@@ -0,0 +1,59 @@
+import numpy as np
+import polars as pl
+
+DISTRIBUTIONS = ["uniform", "polarized", "centered", "slate"]
+
+def generate_election(ballots: int = 1000, candidates: int = 20, distribution: str = "uniform", blank_ratio: float = 0.3, ties: int = 0, seed: int = 0) -> pl.DataFrame:
+	'''
+	Generates a synthetic TEA election shaped like a Google Forms export.
+	:param ballots: The number of ballots.
+	:param candidates: The number of candidate columns.
+	:param distribution: How scores are drawn, one of `DISTRIBUTIONS`. `"polarized"` favours 0s and 5s, `"centered"` favours 2s and 3s, and `"slate"` copies one of a few faction ballots most of the time.
+	:param blank_ratio: The chance of each score being left blank.
+	:param ties: The number of candidates that get an exact copy of another candidate's column, forcing ties that no tie breaker can resolve.
+	:param seed: The random seed, the same arguments and seed always give the same election.
+	:returns: A data frame with a `Timestamp` column followed by one nullable integer column per candidate.
+	'''
+
+	if distribution not in DISTRIBUTIONS:
+		raise ValueError(f"Unknown score distribution: {distribution} (expected one of {', '.join(DISTRIBUTIONS)})")
+	if ties >= candidates:
+		raise ValueError("Cannot force more ties than there are candidates")
+
+	rng = np.random.default_rng(seed)
+
+	if distribution == "uniform":
+		scores = rng.integers(0, 6, size=(ballots, candidates))
+	elif distribution == "polarized":
+		scores = rng.choice(6, size=(ballots, candidates), p=[0.4, 0.05, 0.05, 0.05, 0.05, 0.4])
+	elif distribution == "centered":
+		scores = rng.binomial(5, 0.5, size=(ballots, candidates))
+	else:
+		slates = rng.choice(6, size=(max(2, candidates // 5), candidates), p=[0.5, 0.05, 0.05, 0.05, 0.05, 0.3])
+		scores = np.where(
+			rng.random((ballots, 1)) < 0.8,
+			slates[rng.integers(0, len(slates), size=ballots)],
+			rng.integers(0, 6, size=(ballots, candidates))
+		)
+
+	blanks = rng.random((ballots, candidates)) < blank_ratio
+
+	for j in range(ties):
+		scores[:, candidates - 1 - j] = scores[:, j]
+		blanks[:, candidates - 1 - j] = blanks[:, j]
+
+	return pl.DataFrame(
+		[pl.Series("Timestamp", [f"2025/01/01 {i // 3600 % 24:02}:{i // 60 % 60:02}:{i % 60:02}" for i in range(ballots)])] +
+		[pl.Series(f"Candidate {j + 1}", np.where(blanks[:, j], None, scores[:, j]).tolist(), dtype=pl.Int8) for j in range(candidates)]
+	)
+
+def write_csv(df: pl.DataFrame, path: str) -> str:
+	'''
+	Writes a generated election as a CSV spreadsheet, with blank scores left empty.
+	:param df: The election from `generate_election`.
+	:param path: The file to write.
+	:returns: The given `path`.
+	'''
+
+	df.write_csv(path)
+	return path
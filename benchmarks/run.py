@@ -0,0 +1,104 @@
+from benchmarks.generate import DISTRIBUTIONS, generate_election, write_csv
+from typing import Any, Callable
+import argparse
+import classes
+import json
+import numpy as np
+import os
+import random
+import sys
+import tabulator
+import tempfile
+import time
+import tracemalloc
+import vectorized
+
+PHASES = ["load", "load_batched", "validate", "tabulate", "tie_breakers"]
+
+def measure(fn: Callable[[], Any], repeat: int = 3) -> dict[str, float]:
+	'''
+	Times a function and records its peak traced memory.
+	Allocations made by polars outside of Python are not visible to `tracemalloc`, so peak memory covers Python and numpy objects only.
+	:param fn: The function to benchmark.
+	:param repeat: How many timed runs to take the best of.
+	:returns: A dictionary with `"seconds"`: the best wall time and `"peak_bytes"`: the peak traced memory of one extra run.
+	'''
+
+	timings = []
+	for _ in range(max(1, repeat)):
+		start = time.perf_counter()
+		fn()
+		timings.append(time.perf_counter() - start)
+
+	tracemalloc.start()
+	try:
+		fn()
+		_, peak = tracemalloc.get_traced_memory()
+	finally:
+		tracemalloc.stop()
+
+	return {"seconds": min(timings), "peak_bytes": peak}
+
+def bench_election(path: str, phases: list[str], engines: list[str], repeat: int, seed: int, batch_size: int):
+	'''
+	Runs every requested benchmark phase against one election file.
+	:returns: A generator of result dictionaries, one per phase and engine or tie breaker.
+	'''
+
+	if "load" in phases:
+		yield {"phase": "load", **measure(lambda: tabulator.load_election(path), repeat)}
+	if "load_batched" in phases:
+		yield {"phase": "load_batched", "batch_size": batch_size, **measure(lambda: tabulator.load_election(path, batch_size=batch_size), repeat)}
+	if "validate" in phases:
+		yield {"phase": "validate", **measure(lambda: tabulator.validate_csv(path), repeat)}
+
+	election = tabulator.load_election(path)
+
+	if "tabulate" in phases:
+		for engine in engines:
+			def run():
+				random.seed(seed)
+				return tabulator.tabulate(election, engine=engine)
+			yield {"phase": "tabulate", "engine": engine, "elected": len(run()["rounds"].elected), **measure(run, repeat)}
+
+	if "tie_breakers" in phases:
+		candidates = classes.BallotStore(election.names, election.scores).candidates
+		for breaker in [tabulator.break_wsum_threshold, tabulator.break_weighted_scores, tabulator.break_unweighted_scores]:
+			yield {"phase": "tie_breakers", "breaker": breaker.__name__, **measure(lambda: breaker(candidates, 5), repeat)}
+
+		store = classes.BallotStore(election.names, election.scores)
+		columns = np.arange(len(election.names))
+		yield {"phase": "tie_breakers", "breaker": "vectorized.break_ties", **measure(lambda: vectorized.break_ties(columns, store.scores, store.weights, 5), repeat)}
+
+def main(argv: list[str] | None = None):
+	parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description="Benchmarks TEAbulator against seeded synthetic elections and prints one JSON result per line.")
+	parser.add_argument("--ballots", type=int, nargs="+", default=[1000], help="ballot counts to sweep")
+	parser.add_argument("--candidates", type=int, nargs="+", default=[20], help="candidate counts to sweep")
+	parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="uniform")
+	parser.add_argument("--blank-ratio", type=float, default=0.3)
+	parser.add_argument("--ties", type=int, default=0, help="number of candidates duplicated to force unbreakable ties")
+	parser.add_argument("--seed", type=int, default=0)
+	parser.add_argument("--repeat", type=int, default=3)
+	parser.add_argument("--batch-size", type=int, default=50_000)
+	parser.add_argument("--engines", nargs="+", choices=tabulator.ENGINES, default=tabulator.ENGINES)
+	parser.add_argument("--phases", nargs="+", choices=PHASES, default=PHASES)
+	parser.add_argument("--output", help="file to append results to instead of printing them")
+	args = parser.parse_args(argv)
+
+	out = open(args.output, "a") if args.output else sys.stdout
+	try:
+		with tempfile.TemporaryDirectory() as tmp:
+			for ballots in args.ballots:
+				for candidates in args.candidates:
+					path = write_csv(generate_election(ballots, candidates, args.distribution, args.blank_ratio, args.ties, args.seed), os.path.join(tmp, f"election_{ballots}_{candidates}.csv"))
+					params = {"ballots": ballots, "candidates": candidates, "distribution": args.distribution, "blank_ratio": args.blank_ratio, "ties": args.ties, "seed": args.seed}
+
+					for result in bench_election(path, args.phases, args.engines, args.repeat, args.seed, args.batch_size):
+						out.write(json.dumps({**params, **result}) + "\n")
+						out.flush()
+	finally:
+		if out is not sys.stdout:
+			out.close()
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,47 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TARGETS = {
+	"cli": [sys.executable, "tabulator.py", "--help"],
+	"gui": [sys.executable, "gui.py", "--startup-time"]
+}
+
+def time_command(command: list[str], repeat: int = 5) -> dict:
+	'''
+	Times a command from process creation to exit, in a fresh interpreter each run so nothing is already imported.
+	:param command: The command, run from the repository root.
+	:param repeat: How many runs to take.
+	:returns: A dictionary with the `"seconds"` of the fastest run and their `"median"`, or `"error"` with the last line of output if the command failed.
+	'''
+
+	timings = []
+	for _ in range(max(1, repeat)):
+		start = time.perf_counter()
+		process = subprocess.run(command, cwd=ROOT, capture_output=True, text=True)
+		timings.append(time.perf_counter() - start)
+
+		if process.returncode != 0:
+			lines = (process.stderr or process.stdout).strip().splitlines()
+			return {"error": lines[-1] if lines else f"exit status {process.returncode}"}
+
+	return {"seconds": min(timings), "median": statistics.median(timings)}
+
+def main(argv: list[str] | None = None):
+	parser = argparse.ArgumentParser(prog="python -m benchmarks.startup", description="Times how long the command line and graphical interfaces take to start, and prints one JSON result per line.")
+	parser.add_argument("--targets", nargs="+", choices=list(TARGETS), default=list(TARGETS))
+	parser.add_argument("--repeat", type=int, default=5)
+	parser.add_argument("--gui-command", nargs="+", help="command starting the GUI instead of gui.py, e.g. a frozen TEAbulator.exe followed by --startup-time")
+	args = parser.parse_args(argv)
+
+	commands = {**TARGETS, "gui": args.gui_command or TARGETS["gui"]}
+	for target in args.targets:
+		print(json.dumps({"target": target, "command": " ".join(commands[target]), **time_command(commands[target], args.repeat)}), flush=True)
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,174 @@
+from typing import Callable
+import classes
+import fetch
+import hashlib
+import numpy as np
+import os
+import tabulator
+import tempfile
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+def default_directory() -> str:
+	'''
+	:returns: `TEABULATOR_CACHE_DIR` if set, otherwise a `teabulator` folder in the user's local cache directory.
+	'''
+
+	if (directory := os.environ.get("TEABULATOR_CACHE_DIR")):
+		return directory
+	return os.path.join(os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache"), "teabulator")
+
+def read_content(source: str, progress: Callable[[int, int | None], None] | None = None) -> str:
+	'''
+	Prepares a spreadsheet for hashing, downloading it if it is a URL.
+	:param source: The filename or CSV file URL of the spreadsheet, as returned by `tabulator.resolve_source`.
+	:param progress: Called with the number of bytes downloaded so far and the total, if known, while a URL is downloaded (see `fetch.Fetcher.fetch`).
+	:returns: A filename, so the spreadsheet can be hashed and loaded without being held in memory: the source itself for local files, or the file a URL was downloaded to.
+	'''
+
+	return source if os.path.exists(source) else fetch.fetch(source, progress)
+
+class ElectionCache:
+	'''
+	On-disk cache of validated ballot matrices and their tabulated round histories.
+	Entries are keyed by a hash of the spreadsheet contents, the engine and `tabulator.ENGINE_VERSION`, and the least recently used ones are evicted once the cache outgrows `max_bytes`.
+	'''
+
+	def __init__(self, directory: str | None = None, max_bytes: int = DEFAULT_MAX_BYTES):
+		self.directory = directory or default_directory()
+		self.max_bytes = max_bytes
+
+	def key(self, content: str | bytes, engine: str) -> str:
+		'''
+		:param content: A filename, hashed by streaming the file, or the contents of a spreadsheet.
+		:param engine: The tabulation engine.
+		:returns: The cache key of the spreadsheet.
+		'''
+
+		digest = hashlib.sha256(f"{tabulator.ENGINE_VERSION}:{engine}:".encode())
+		if isinstance(content, bytes):
+			digest.update(content)
+		else:
+			with open(content, "rb") as f:
+				while (block := f.read(1 << 20)):
+					digest.update(block)
+
+		return digest.hexdigest()
+
+	def _path(self, key: str) -> str:
+		return os.path.join(self.directory, f"{key}.npz")
+
+	def get(self, key: str) -> tuple[classes.BallotMatrix, dict] | None:
+		'''
+		:param key: The cache key from `key`.
+		:returns: The ballot matrix and the result of `tabulator.tabulate`, or `None` if nothing is cached under the key.
+		'''
+
+		path = self._path(key)
+		try:
+			with np.load(path, allow_pickle=False) as arrays:
+				arrays = dict(arrays)
+		except (OSError, ValueError, KeyError):
+			return None
+
+		try:
+			os.utime(path) # marks the entry as recently used
+		except OSError:
+			pass # evicted by another process since it was read, which the arrays read no longer depend on
+
+		election = classes.BallotMatrix(arrays.pop("names").tolist(), arrays.pop("scores"), str(arrays.pop("source")) or None)
+		store = classes.BallotStore(election.names, election.scores)
+		store.weights = arrays.pop("weights") # fixed-point weights keep their integer type
+
+		return election, {
+			"rounds": classes.RoundHistory.from_arrays(store.candidates, arrays),
+			"quota": float(arrays["quota"]),
+			"seats": int(arrays["seats"])
+		}
+
+	def put(self, key: str, election: classes.BallotMatrix, result: dict):
+		'''
+		Stores a tabulated election, then evicts the least recently used entries if the cache is too large.
+		A cache that cannot be written to only costs speed, so errors writing it are ignored.
+		:param key: The cache key from `key`.
+		:param election: The ballot matrix.
+		:param result: The result of `tabulator.tabulate` for the ballot matrix.
+		'''
+
+		try:
+			self._write(key, election, result)
+			self.evict()
+		except OSError:
+			pass
+
+	def _write(self, key: str, election: classes.BallotMatrix, result: dict):
+		rounds: classes.RoundHistory = result["rounds"]
+		store = rounds.candidates[0].store if rounds.candidates and rounds.candidates[0].store else None
+
+		os.makedirs(self.directory, exist_ok=True)
+		fd, tmp = tempfile.mkstemp(suffix=".npz", dir=self.directory)
+		try:
+			with os.fdopen(fd, "wb") as f:
+				np.savez(
+					f,
+					names=np.array(election.names, dtype=str),
+					scores=election.scores,
+					source=np.array(election.source or ""),
+					weights=store.weights if store else np.ones(len(election.scores)),
+					quota=np.array(result["quota"]),
+					seats=np.array(result["seats"]),
+					**rounds.to_arrays()
+				)
+			os.replace(tmp, self._path(key))
+		except BaseException:
+			os.remove(tmp)
+			raise
+
+	def evict(self):
+		'''
+		Removes the least recently used entries until the cache fits in `max_bytes`.
+		Processes sharing the cache, such as the workers of `batch.py`, may evict the same entries at once, so entries that are already gone are skipped.
+		'''
+
+		entries = []
+		for entry in os.scandir(self.directory):
+			if entry.name.endswith(".npz"):
+				try:
+					stat = entry.stat()
+				except FileNotFoundError:
+					continue
+				entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+		total = sum(size for (_, size, _) in entries)
+		for (_, size, path) in sorted(entries):
+			if total <= self.max_bytes:
+				break
+			try:
+				os.remove(path)
+			except FileNotFoundError:
+				pass
+			total -= size
+
+def tabulate_cached(file_or_url: str, engine: str = "python", stats: classes.TabulationStats | None = None, cache: ElectionCache | None = None) -> tuple[classes.BallotMatrix, dict]:
+	'''
+	Loads and tabulates a spreadsheet, reusing the cached result when its contents have been tabulated before.
+	:param file_or_url: The filename or Google Sheets document link of the spreadsheet.
+	:param engine: The tabulation engine to use, one of `tabulator.ENGINES`.
+	:param stats: If given, filled in by `tabulator.tabulate` on a cache miss.
+	:param cache: The cache to use, an `ElectionCache` in the default directory if not given.
+	:returns: The ballot matrix and the result of `tabulator.tabulate`.
+	'''
+
+	cache = cache or ElectionCache()
+	source = tabulator.resolve_source(file_or_url)
+	content = read_content(source)
+	key = cache.key(content, engine)
+
+	if (cached := cache.get(key)):
+		return cached
+
+	election = tabulator.load_election(content)
+	election.source = source
+	data = tabulator.tabulate(election, engine, stats)
+	cache.put(key, election, data)
+	return election, data
@@ -1,15 +1,380 @@
 from dataclasses import dataclass, field
+from typing import Callable, Iterator
+import heapq
+import numpy as np
+import time
+
+SPARSE_DENSITY = 0.25 # largest fraction of cast scores for which a `BallotStore` indexes them sparsely
+WEIGHT_SCALE = 1 << 32 # the weight of a whole ballot in fixed-point stores
 
-@dataclass
 class Ballot:
-	weight: float
-	scores: list[int]
-	timestamp: str | None = None
+	'''
+	View of one row of a `BallotStore`.
+	'''
+
+	__slots__ = ("store", "index")
+
+	def __init__(self, store: "BallotStore", index: int):
+		self.store = store
+		self.index = index
+
+	@property
+	def weight(self) -> float:
+		return self.store.weights.item(self.index)
+
+	@weight.setter
+	def weight(self, value: float):
+		self.store.weights[self.index] = value
+
+	@property
+	def scores(self) -> np.ndarray:
+		return self.store.scores[self.index]
+
+	def columns_at(self, threshold: int) -> list[int]:
+		'''The columns this ballot scores at or above a threshold.'''
+		if self.store.sparse is not None:
+			return self.store.sparse.row_at(self.index, threshold).tolist()
+		return np.flatnonzero(self.scores >= threshold).tolist()
+
+	@property
+	def count(self) -> int:
+		'''The number of identical ballots this one stands for, each carrying `weight`.'''
+		return self.store.counts.item(self.index)
+
+	def __repr__(self):
+		return f"Ballot(weight={self.weight}, scores={self.scores.tolist()}, count={self.count})"
 
-@dataclass
 class Candidate:
-	name: str
-	ballots: list[tuple[Ballot, int]] = field(default_factory=list)
+	'''
+	View of one column of a `BallotStore`. Candidates created without a store have no ballots.
+	'''
+
+	__slots__ = ("name", "store", "column")
+
+	def __init__(self, name: str, store: "BallotStore | None" = None, column: int = 0):
+		self.name = name
+		self.store = store
+		self.column = column
+
+	@property
+	def ballots(self) -> list[tuple[Ballot, int]]:
+		if self.store is None:
+			return []
+		return list(zip(self.store.ballots, self.store.scores[:, self.column].tolist()))
+
+	def rows_at(self, threshold: int) -> np.ndarray:
+		'''The store rows of the ballots scoring this candidate at or above a threshold, in ballot order.'''
+		if self.store is None:
+			return np.empty(0, dtype=np.int64)
+		if self.store.sparse is not None:
+			return self.store.sparse.column_at(self.column, threshold)
+		return np.flatnonzero(self.store.scores[:, self.column] >= threshold)
+
+	def ballots_at(self, threshold: int) -> list[Ballot]:
+		if self.store is None:
+			return []
+		return [self.store.ballots[i] for i in self.rows_at(threshold).tolist()]
+
+	def total_at(self, threshold: int) -> float:
+		'''The total weight of the ballots scoring this candidate at or above a threshold, added up in ballot order like summing `ballots_at`.'''
+		if self.store is None:
+			return 0.0
+		rows = self.rows_at(threshold)
+		return float(sum((self.store.weights[rows] * self.store.counts[rows]).tolist()))
+
+	def __repr__(self):
+		return f"Candidate(name={self.name!r})"
+
+class SparseScores:
+	'''
+	Row and column indexes (CSR and CSC) of the cast scores of a score matrix, so threshold queries visit only the cells that were filled in.
+	Both indexes keep their entries in ballot order, so sums over them accumulate in the same order as over the dense matrix.
+	'''
+
+	__slots__ = ("shape", "row_ptr", "row_columns", "row_scores", "entry_rows", "column_ptr", "column_rows", "column_scores")
+
+	def __init__(self, scores: np.ndarray):
+		self.shape = scores.shape
+		n_ballots, n_candidates = scores.shape
+
+		rows, columns = np.nonzero(scores)
+		values = scores[rows, columns]
+
+		self.row_ptr = np.zeros(n_ballots + 1, dtype=np.int64)
+		np.cumsum(np.bincount(rows, minlength=n_ballots), out=self.row_ptr[1:])
+		self.row_columns = columns.astype(np.int32)
+		self.row_scores = values
+		self.entry_rows = rows.astype(np.int32)
+
+		order = np.argsort(columns, kind="stable")
+		self.column_ptr = np.zeros(n_candidates + 1, dtype=np.int64)
+		np.cumsum(np.bincount(columns, minlength=n_candidates), out=self.column_ptr[1:])
+		self.column_rows = self.entry_rows[order]
+		self.column_scores = values[order]
+
+	@staticmethod
+	def _sum_by(columns: np.ndarray, weights: np.ndarray, length: int) -> np.ndarray:
+		if weights.dtype.kind == "f":
+			return np.bincount(columns, weights=weights, minlength=length)
+		totals = np.zeros(length, dtype=weights.dtype) # `np.bincount` would sum fixed-point weights as floats
+		np.add.at(totals, columns, weights)
+		return totals
+
+	def column_at(self, column: int, threshold: int) -> np.ndarray:
+		'''
+		:returns: The rows scoring a column at or above a threshold, in ballot order.
+		'''
+
+		start, end = self.column_ptr[column], self.column_ptr[column + 1]
+		return self.column_rows[start:end][self.column_scores[start:end] >= threshold]
+
+	def row_at(self, row: int, threshold: int) -> np.ndarray:
+		'''
+		:returns: The columns a row scores at or above a threshold, in candidate order.
+		'''
+
+		start, end = self.row_ptr[row], self.row_ptr[row + 1]
+		return self.row_columns[start:end][self.row_scores[start:end] >= threshold]
+
+	def _entries(self, rows: np.ndarray | None) -> tuple[np.ndarray, np.ndarray]:
+		# the CSR entries of some rows, in the given order, and the position in `rows` of each
+		if rows is None:
+			return np.arange(len(self.row_columns)), self.entry_rows
+		starts = self.row_ptr[rows]
+		lengths = self.row_ptr[rows + 1] - starts
+		owners = np.repeat(np.arange(len(rows)), lengths)
+		return starts[owners] + np.arange(len(owners)) - np.repeat(np.cumsum(lengths) - lengths, lengths), owners
+
+	def tally(self, weights: np.ndarray, threshold: int, rows: np.ndarray | None = None) -> np.ndarray:
+		'''
+		Sums a weight per row over the rows scoring each column at or above a threshold, like `vectorized._tally` over the dense matrix.
+		:param weights: The weight of each row in `rows`, or of every row if `rows` is not given.
+		:param threshold: The threshold.
+		:param rows: Some rows in ascending order, every row if not given.
+		:returns: The sum of each column.
+		'''
+
+		entries, owners = self._entries(rows)
+		hits = self.row_scores[entries] >= threshold
+		return self._sum_by(self.row_columns[entries][hits], weights[owners[hits]], self.shape[1])
+
+	def tally_columns(self, weights: np.ndarray, threshold: int, columns: list[int]) -> np.ndarray:
+		'''
+		Sums a weight per row over the rows scoring some columns at or above a threshold, in the same order as `tally`.
+		:param weights: The weight of every row.
+		:param threshold: The threshold.
+		:param columns: The columns to sum.
+		:returns: The sum of each of `columns`.
+		'''
+
+		column_rows = [self.column_at(j, threshold) for j in columns]
+		owners = np.repeat(np.arange(len(columns)), [len(rows) for rows in column_rows])
+		return self._sum_by(owners, weights[np.concatenate(column_rows)], len(columns))
+
+	def columns_at(self, rows: np.ndarray, threshold: int) -> list[int]:
+		'''
+		:returns: The columns that one of some rows scores at or above a threshold, in candidate order.
+		'''
+
+		entries, _ = self._entries(rows)
+		return np.unique(self.row_columns[entries][self.row_scores[entries] >= threshold]).tolist()
+
+class BallotStore:
+	'''
+	Array-backed ballots of one tabulation: an int8 score matrix, a float64 weight vector, an int64 multiplicity vector, and `Ballot`/`Candidate` views over them.
+	When at most `SPARSE_DENSITY` of the scores are cast, as in wide fields where voters score only a few candidates, they are also indexed by a `SparseScores`.
+	Fixed-point stores keep the weights as int64 multiples of `1 / WEIGHT_SCALE` instead, so that sums of them are exact in any order.
+	'''
+
+	__slots__ = ("scores", "weights", "counts", "sparse", "candidates", "_ballots")
+
+	def __init__(self, names: list[str], scores: np.ndarray, counts: np.ndarray | None = None, fixed_point: bool = False):
+		self.scores = np.ascontiguousarray(scores, dtype=np.int8)
+		self.weights = np.full(len(self.scores), WEIGHT_SCALE, dtype=np.int64) if fixed_point else np.ones(len(self.scores))
+		self.counts = np.ones(len(self.scores), dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+		self.sparse = SparseScores(self.scores) if np.count_nonzero(self.scores) <= SPARSE_DENSITY * self.scores.size else None
+		self.candidates = [Candidate(name, self, j) for j, name in enumerate(names)]
+		self._ballots: list[Ballot] | None = None
+
+	@property
+	def ballots(self) -> list[Ballot]:
+		'''A `Ballot` view of every row, created when first asked for, as only the python engine walks ballot objects.'''
+		if self._ballots is None:
+			self._ballots = [Ballot(self, i) for i in range(len(self.scores))]
+		return self._ballots
+
+@dataclass
+class BallotMatrix:
+	names: list[str]
+	scores: np.ndarray # int8, shape (ballots, candidates), blank scores filled in as 0
+	source: str | None = None
+	counts: np.ndarray | None = None # how many identical ballots each row stands for, one each if not given (see `tabulator.group_ballots`)
+
+class ThresholdTally:
+	'''
+	Total weight of the ballots scoring each candidate at or above a threshold, summed again only for the candidates whose ballots were reweighted.
+	Each total is always summed in ballot order, as subtracting weight changes from it would drift from the sum of the weights it stands for.
+	'''
+
+	def __init__(self, candidates: list[Candidate], threshold: int):
+		self.candidates = candidates
+		self._index = {id(c): j for j, c in enumerate(candidates)}
+		self.rebuild(threshold)
+
+	def __getitem__(self, candidate: Candidate) -> float:
+		return self.totals[self._index[id(candidate)]]
+
+	def rebuild(self, threshold: int):
+		self.threshold = threshold
+		self.totals = [c.total_at(threshold) for c in self.candidates]
+
+	def reweight(self, ballots: list[Ballot], weights: list[float]) -> list[int]:
+		'''
+		Sets the weights of some ballots, then sums the totals they changed again.
+		:returns: The columns of the candidates that one of the ballots whose weight changed scores at or above the threshold.
+		'''
+
+		touched = set()
+		for ballot, weight in zip(ballots, weights):
+			if ballot.weight != weight:
+				touched.update(ballot.columns_at(self.threshold))
+			ballot.weight = weight
+
+		for j in touched:
+			self.totals[j] = self.candidates[j].total_at(self.threshold)
+		return sorted(touched)
+
+class NValueQueue:
+	'''
+	Min-heap of the n-values of the candidates at one threshold.
+	An n-value is solved once and kept until a reweight touches one of the candidate's ballots, and entries left behind by re-solved or ineligible candidates are dropped as they surface.
+	'''
+
+	def __init__(self, solve: Callable[[list[int]], list[float]]):
+		'''
+		:param solve: Computes the n-values of some candidate columns.
+		'''
+
+		self.solve = solve
+		self._n: dict[int, float] = {} # known n-values, by column
+		self._version: dict[int, int] = {}
+		self._heap: list[tuple[float, int, int]] = [] # (n, column, version)
+
+	def invalidate(self, columns: list[int]):
+		'''
+		Marks the n-values of some columns as outdated, e.g. the ones returned by `ThresholdTally.reweight`.
+		'''
+
+		for j in columns:
+			self._n.pop(j, None)
+
+	def minimum(self, columns: list[int]) -> list[tuple[int, float]]:
+		'''
+		Solves the outdated n-values of the eligible columns, then finds the smallest.
+		:param columns: The eligible columns, in candidate order.
+		:returns: `(i, n)` for every eligible column whose n-value is the smallest, where `i` is its position in `columns`.
+		'''
+
+		dirty = [j for j in columns if j not in self._n]
+		if dirty:
+			for j, n in zip(dirty, self.solve(dirty)):
+				self._n[j] = n
+				self._version[j] = version = self._version.get(j, -1) + 1
+				heapq.heappush(self._heap, (n, j, version))
+
+		position = {j: i for i, j in enumerate(columns)}
+
+		smallest = []
+		while self._heap:
+			entry = self._heap[0]
+			if entry[1] not in position:
+				heapq.heappop(self._heap)
+				self._n.pop(entry[1], None) # solved again should it ever become eligible
+			elif entry[1] not in self._n or self._version[entry[1]] != entry[2]:
+				heapq.heappop(self._heap)
+			elif not smallest or entry[0] == smallest[0][0]:
+				smallest.append(heapq.heappop(self._heap))
+			else:
+				break
+
+		for entry in smallest:
+			heapq.heappush(self._heap, entry)
+
+		return sorted((position[j], n) for (n, j, _) in smallest)
+
+class TieBreakAggregates:
+	'''
+	The per-candidate sums compared by the tie breakers, for the candidates tied in one round.
+	Each kind of sum is computed once, when a breaker first asks for it, over the tied columns only. The sums are accumulated in ballot order, so every breaker in the chain and both engines compare identical values.
+	'''
+
+	KINDS = ("wsum_threshold", "weighted_scores", "unweighted_scores")
+
+	def __init__(self, scores: np.ndarray, weights: np.ndarray, columns: list[int], threshold: int, counts: np.ndarray | None = None):
+		self.scores = scores
+		self.weights = weights if counts is None else weights * counts
+		self.counts = counts
+		self.columns = columns
+		self.threshold = threshold
+		self._position = {column: i for i, column in enumerate(columns)}
+		self._sums: dict[str, list] = {}
+
+	def lookup(self, kind: str, columns: list[int]) -> list:
+		'''
+		:param kind: One of `KINDS`: the total weight of ballots at or above the threshold, the sum of weighted scores, or the sum of unweighted scores.
+		:param columns: Some of the tied columns.
+		:returns: The sums of the given columns.
+		'''
+
+		if kind not in self._sums:
+			scores = self.scores[:, self.columns]
+			if kind == "unweighted_scores":
+				self._sums[kind] = (scores.sum(axis=0, dtype=np.int64) if self.counts is None else (scores * self.counts[:, None]).sum(axis=0)).tolist()
+			else:
+				# a C-ordered product is reduced row by row, in the same order as summing over `Candidate.ballots`
+				factors = scores >= self.threshold if kind == "wsum_threshold" else scores
+				self._sums[kind] = np.multiply(self.weights[:, None], factors, order="C").sum(axis=0).tolist()
+
+		sums = self._sums[kind]
+		return [sums[self._position[column]] for column in columns]
+
+@dataclass
+class TabulationStats:
+	phases: dict[str, float] = field(default_factory=dict) # seconds spent in each phase, summed over all rounds
+	rounds: list[float] = field(default_factory=list) # seconds taken by each elected round
+	compute_n_calls: int = 0
+	compute_n_ballots: int = 0 # ballots solved over across all compute_n calls
+	tie_breaks: dict[str, int] = field(default_factory=dict) # invocations by breaker, "random" when all of them failed
+	ballots_reweighted: int = 0
+	_mark: float = field(default=0.0, repr=False)
+	_round_mark: float = field(default=0.0, repr=False)
+
+	def start(self):
+		self._mark = time.perf_counter()
+
+	def lap(self, phase: str):
+		now = time.perf_counter()
+		self.phases[phase] = self.phases.get(phase, 0.0) + now - self._mark
+		self._mark = now
+
+	def begin_round(self):
+		self._round_mark = time.perf_counter()
+
+	def end_round(self):
+		self.rounds.append(time.perf_counter() - self._round_mark)
+
+	def count_tie_break(self, breaker: str):
+		self.tie_breaks[breaker] = self.tie_breaks.get(breaker, 0) + 1
+
+	def summary(self) -> str:
+		lines = [
+			"Phases: " + ", ".join(f"{phase} {seconds:.4f}s" for phase, seconds in self.phases.items()),
+			f"Rounds: {len(self.rounds)} in {sum(self.rounds):.4f}s" + (f" (slowest {max(self.rounds):.4f}s)" if self.rounds else ""),
+			f"compute_n: {self.compute_n_calls} calls over {self.compute_n_ballots} ballots",
+			"Tie breaks: " + (", ".join(f"{breaker} {count}" for breaker, count in self.tie_breaks.items()) or "none"),
+			f"Ballots reweighted: {self.ballots_reweighted}"
+		]
+		return "\n".join(lines)
 
 @dataclass
 class FakeRegexResult:
@@ -24,4 +389,213 @@ class TabulationRound:
 	reweighing: list[Candidate] = []
 	unelected: list[Candidate] = []
 	threshold: int
-	weights: dict[str, float]
\ No newline at end of file
+	weights: dict[str, float]
+
+class RoundHistory:
+	'''
+	Tabulation rounds stored as the weights that changed in each round, materialized into `TabulationRound`s only when read.
+	Index 0 is the zero round. Full weights are kept every `checkpoint_every` rounds so any round can be rebuilt from a nearby one.
+	'''
+
+	def __init__(self, candidates: list[Candidate], weights: list[float] | np.ndarray, threshold: int, checkpoint_every: int = 32):
+		self.candidates = candidates
+		self.checkpoint_every = checkpoint_every
+		self._thresholds: list[int] = []
+		self._elected: list[int] = [] # column of the elected candidate, -1 for the zero round and reweighing rounds
+		self._reweighing: list[tuple[int, ...]] = []
+		self._changes: list[tuple[np.ndarray, np.ndarray]] = []
+		self._checkpoints: dict[int, np.ndarray] = {}
+		self._elected_order: list[int] = []
+		self._elected_counts: list[int] = []
+		self._last = np.zeros(len(candidates))
+		self._cursor: tuple[int, np.ndarray] | None = None
+
+		self.record(weights, threshold)
+
+	def record(self, weights: list[float] | np.ndarray, threshold: int, elected: int | None = None, reweighing: list[int] | None = None):
+		'''
+		Appends a round.
+		:param weights: The weight of every candidate in this round, in column order.
+		:param threshold: The threshold of this round.
+		:param elected: The column of the candidate elected in this round, or `None` for the zero round and reweighing rounds.
+		:param reweighing: The columns of the candidates being reweighted in this round.
+		'''
+
+		weights = np.array(weights, dtype=np.float64)
+		index = len(self._thresholds)
+		changed = np.flatnonzero(weights != self._last) if index else np.arange(len(weights))
+
+		self._thresholds.append(threshold)
+		self._elected.append(-1 if elected is None else elected)
+		self._reweighing.append(tuple(reweighing or ()))
+		self._changes.append((changed.astype(np.int32), weights[changed]))
+
+		if elected is not None:
+			self._elected_order.append(elected)
+		self._elected_counts.append(len(self._elected_order))
+
+		if index % self.checkpoint_every == 0:
+			self._checkpoints[index] = weights
+		self._last = weights
+
+	def to_arrays(self, start: int = 0) -> dict[str, np.ndarray]:
+		'''
+		Flattens the history into plain arrays, e.g. for `np.savez`.
+		:param start: The first round to flatten. Every round after the zero round only holds the weights that changed since the round before it, so the rounds from `start` can only be appended to a history that has all rounds before it (see `extend`).
+		'''
+
+		changes = self._changes[start:]
+		reweighing = self._reweighing[start:]
+		return {
+			"thresholds": np.array(self._thresholds[start:], dtype=np.int8),
+			"elected": np.array(self._elected[start:], dtype=np.int32),
+			"reweighing": np.array([j for r in reweighing for j in r], dtype=np.int32),
+			"reweighing_counts": np.array([len(r) for r in reweighing], dtype=np.int32),
+			"changed": np.concatenate([np.zeros(0, dtype=np.int32)] + [changed for (changed, _) in changes]),
+			"values": np.concatenate([np.zeros(0)] + [values for (_, values) in changes]),
+			"change_counts": np.array([len(changed) for (changed, _) in changes], dtype=np.int32),
+			"checkpoint_every": np.array(self.checkpoint_every)
+		}
+
+	@staticmethod
+	def _unflatten(arrays: dict[str, np.ndarray]) -> list[tuple[int, int, np.ndarray, np.ndarray, list[int]]]:
+		# `(threshold, elected, changed, values, reweighing)` for each round flattened by `to_arrays`
+		changes = np.cumsum(arrays["change_counts"])[:-1]
+		reweighing = np.cumsum(arrays["reweighing_counts"])[:-1]
+		return list(zip(
+			arrays["thresholds"].tolist(), arrays["elected"].tolist(), np.split(arrays["changed"], changes), np.split(arrays["values"], changes), [r.tolist() for r in np.split(arrays["reweighing"], reweighing)]
+		))
+
+	@classmethod
+	def from_arrays(cls, candidates: list[Candidate], arrays: dict[str, np.ndarray]) -> "RoundHistory":
+		'''
+		Rebuilds a history flattened by `to_arrays`.
+		:param candidates: The candidates of the election, in column order.
+		:param arrays: The arrays returned by `to_arrays`.
+		'''
+
+		(threshold, _, _, values, _), *rounds = cls._unflatten(arrays)
+		history = cls(candidates, values, threshold, int(arrays["checkpoint_every"]))
+		history._replay(rounds)
+		return history
+
+	def extend(self, arrays: dict[str, np.ndarray]):
+		'''
+		Appends the rounds of another history of the same election, e.g. one being tabulated in another process.
+		:param arrays: The arrays returned by `to_arrays(len(self))` on the other history.
+		'''
+
+		self._replay(self._unflatten(arrays))
+
+	def _replay(self, rounds: list[tuple[int, int, np.ndarray, np.ndarray, list[int]]]):
+		for threshold, elected, changed, values, reweighing in rounds:
+			weights = self._last.copy()
+			weights[changed] = values
+			self.record(weights, threshold, None if elected < 0 else elected, reweighing)
+
+	@property
+	def elected(self) -> list[Candidate]:
+		'''The elected candidates in order of election, without materializing any round.'''
+		return [self.candidates[j] for j in self._elected_order]
+
+	def _weights_at(self, index: int) -> np.ndarray:
+		start = index - index % self.checkpoint_every
+		if self._cursor and start <= self._cursor[0] <= index:
+			start, weights = self._cursor
+			weights = weights.copy()
+		else:
+			weights = self._checkpoints[start].copy()
+
+		for k in range(start + 1, index + 1):
+			changed, values = self._changes[k]
+			weights[changed] = values
+
+		self._cursor = (index, weights)
+		return weights
+
+	def _materialize(self, index: int) -> "TabulationRound":
+		_round = TabulationRound()
+		_round._round = index
+		_round.threshold = self._thresholds[index]
+		_round.weights = {c.name: w for c, w in zip(self.candidates, self._weights_at(index).tolist())}
+		_round.reweighing = [self.candidates[j] for j in self._reweighing[index]]
+
+		if self._elected[index] >= 0:
+			_round.elected = self.candidates[self._elected[index]]
+			elected = set(self._elected_order[:self._elected_counts[index]])
+			_round.unelected = [c for j, c in enumerate(self.candidates) if j not in elected]
+		elif index == 0:
+			_round.unelected = self.candidates
+
+		return _round
+
+	def __len__(self) -> int:
+		return len(self._thresholds)
+
+	def __getitem__(self, index: int | slice):
+		if isinstance(index, slice):
+			return [self._materialize(k) for k in range(*index.indices(len(self)))]
+		if index < 0:
+			index += len(self)
+		if not 0 <= index < len(self):
+			raise IndexError("round index out of range")
+		return self._materialize(index)
+
+	def __iter__(self):
+		for index in range(len(self)):
+			yield self._materialize(index)
+
+class Tabulation:
+	'''
+	A tabulation in progress, deciding its rounds only as they are requested. See `tabulator.tabulate_iter`.
+	'''
+
+	def __init__(self, steps: Iterator[None], rounds: RoundHistory, quota: float, seats: int):
+		self._steps = steps
+		self.rounds = rounds
+		self.quota = quota
+		self.seats = seats
+		self.finished = False
+
+	def advance(self) -> bool:
+		'''
+		Runs the tabulation until it records its next round.
+		:returns: Whether a round was recorded, `False` once the tabulation has finished.
+		'''
+
+		if not self.finished:
+			try:
+				next(self._steps)
+				return True
+			except StopIteration:
+				self.finished = True
+		return False
+
+	def close(self):
+		'''
+		Abandons the tabulation, leaving `rounds` as far as it got.
+		'''
+
+		self._steps.close()
+		self.finished = True
+
+	def result(self) -> dict:
+		'''
+		Runs the tabulation to the end.
+		:returns: The same dictionary as `tabulator.tabulate`.
+		'''
+
+		while self.advance():
+			pass
+
+		return {
+			"rounds": self.rounds,
+			"quota": self.quota,
+			"seats": self.seats
+		}
+
+	def __iter__(self) -> Iterator[TabulationRound]:
+		index = 0
+		while index < len(self.rounds) or self.advance():
+			yield self.rounds[index]
+			index += 1
@@ -0,0 +1,236 @@
+from typing import Callable
+import hashlib
+import http.client
+import json
+import os
+import tempfile
+import threading
+import urllib.parse
+import zlib
+
+DEFAULT_TIMEOUT = 60 # seconds to wait for the server
+CHUNK_SIZE = 1 << 16
+MAX_REDIRECTS = 5
+MAX_IDLE = 4 # idle connections kept per host
+REDIRECTS = (301, 302, 303, 307, 308)
+
+class ConnectionPool:
+	'''
+	Keep-alive HTTP and HTTPS connections, reused by every request to the same host.
+	'''
+
+	def __init__(self, max_idle: int = MAX_IDLE):
+		self.max_idle = max_idle
+		self._idle: dict[tuple[str, str, int | None], list[http.client.HTTPConnection]] = {}
+		self._lock = threading.Lock()
+
+	def acquire(self, key: tuple[str, str, int | None], timeout: float) -> tuple[http.client.HTTPConnection, bool]:
+		'''
+		:param key: The `(scheme, host, port)` to connect to.
+		:param timeout: The number of seconds to wait for the server.
+		:returns: A connection, and whether it is an idle one that the server may have closed since.
+		'''
+
+		with self._lock:
+			idle = self._idle.get(key)
+			connection = idle.pop() if idle else None
+
+		if connection is not None:
+			connection.timeout = timeout
+			if connection.sock:
+				connection.sock.settimeout(timeout)
+			return connection, True
+
+		scheme, host, port = key
+		connection_type = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+		return connection_type(host, port, timeout=timeout), False
+
+	def release(self, key: tuple[str, str, int | None], connection: http.client.HTTPConnection):
+		'''
+		Returns a connection whose response has been read to the end, keeping it for the next request to its host.
+		'''
+
+		with self._lock:
+			idle = self._idle.setdefault(key, [])
+			if len(idle) < self.max_idle:
+				idle.append(connection)
+				return
+		connection.close()
+
+	def close(self):
+		with self._lock:
+			idle, self._idle = self._idle, {}
+		for connections in idle.values():
+			for connection in connections:
+				connection.close()
+
+class Fetcher:
+	'''
+	Downloads spreadsheets over pooled connections, asking for gzip and streaming the body into a file.
+	Every download is kept in `directory` with its ETag and Last-Modified headers, so fetching a URL again only revalidates it, and the server answers an unchanged spreadsheet with an empty 304 response.
+	'''
+
+	def __init__(self, directory: str | None = None, timeout: float = DEFAULT_TIMEOUT, pool: ConnectionPool | None = None):
+		'''
+		:param directory: Where downloads are kept, a `downloads` folder in `cache.default_directory()` if not given.
+		:param timeout: The default number of seconds to wait for the server.
+		:param pool: The connections to use, a new pool if not given.
+		'''
+
+		if directory is None:
+			from cache import default_directory
+			directory = os.path.join(default_directory(), "downloads")
+
+		self.directory = directory
+		self.timeout = timeout
+		self.pool = pool or ConnectionPool()
+
+	def path(self, url: str) -> str:
+		'''
+		:returns: The file a URL is downloaded to.
+		'''
+
+		return os.path.join(self.directory, hashlib.sha256(url.encode()).hexdigest())
+
+	def _validators(self, url: str) -> dict:
+		try:
+			with open(self.path(url) + ".json") as f:
+				validators = json.load(f)
+			stat = os.stat(self.path(url))
+		except (OSError, ValueError):
+			return {}
+		# processes fetching the same URL at once can leave the validators of one download next to the body of another, which is then downloaded again
+		if validators.get("url") != url or validators.get("body") != _identity(stat):
+			return {}
+		return validators
+
+	def _request(self, url: str, headers: dict[str, str], timeout: float) -> tuple[http.client.HTTPResponse, tuple, http.client.HTTPConnection]:
+		parts = urllib.parse.urlsplit(url)
+		if parts.scheme not in ("http", "https") or not parts.hostname:
+			raise ValueError(f"Invalid spreadsheet URL: {url}")
+
+		key = (parts.scheme, parts.hostname, parts.port)
+		target = urllib.parse.urlunsplit(("", "", parts.path or "/", parts.query, ""))
+
+		while True:
+			connection, reused = self.pool.acquire(key, timeout)
+			try:
+				connection.request("GET", target, headers=headers)
+				return connection.getresponse(), key, connection
+			except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+				connection.close()
+				if not reused:
+					raise
+				# the server closed the idle connection in the meantime, so retry on a new one
+
+	def _finish(self, response: http.client.HTTPResponse, key: tuple, connection: http.client.HTTPConnection):
+		response.read()
+		if response.will_close:
+			connection.close()
+		else:
+			self.pool.release(key, connection)
+
+	def fetch(self, url: str, progress: Callable[[int, int | None], None] | None = None, timeout: float | None = None) -> str:
+		'''
+		Downloads a URL, or revalidates the last download of it.
+		:param url: The HTTP or HTTPS URL, e.g. from `tabulator.build_csv_url`.
+		:param progress: Called with the number of bytes received so far and the total number of bytes, if the server tells, after each chunk of the download.
+		:param timeout: The number of seconds to wait for the server, `self.timeout` if not given.
+		:returns: The file holding the contents of the URL. It is replaced, not modified, when the contents change.
+		'''
+
+		timeout = self.timeout if timeout is None else timeout
+		validators = self._validators(url)
+		headers = {"Accept-Encoding": "gzip", "User-Agent": "TEAbulator"}
+		if validators.get("etag"):
+			headers["If-None-Match"] = validators["etag"]
+		if validators.get("last_modified"):
+			headers["If-Modified-Since"] = validators["last_modified"]
+
+		location = url
+		for _ in range(MAX_REDIRECTS + 1):
+			response, key, connection = self._request(location, headers, timeout)
+			if response.status not in REDIRECTS:
+				break
+			location = urllib.parse.urljoin(location, response.getheader("Location", ""))
+			self._finish(response, key, connection)
+		else:
+			connection.close()
+			raise OSError(f"Too many redirects fetching {url}")
+
+		if response.status == 304:
+			self._finish(response, key, connection)
+			return self.path(url)
+		if response.status != 200:
+			connection.close()
+			raise OSError(f"HTTP error {response.status} ({response.reason}) fetching {url}")
+
+		try:
+			body = self._download(url, response, progress)
+		except BaseException:
+			connection.close()
+			raise
+		self._finish(response, key, connection)
+
+		self._write_validators(url, {"url": url, "etag": response.getheader("ETag"), "last_modified": response.getheader("Last-Modified"), "body": body})
+		return self.path(url)
+
+	def _download(self, url: str, response: http.client.HTTPResponse, progress: Callable[[int, int | None], None] | None) -> list[int]:
+		# returns the identity of the file written, taken before another process can replace it
+		length = response.getheader("Content-Length")
+		total = int(length) if length and length.isdigit() else None
+		decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if response.getheader("Content-Encoding", "").lower() == "gzip" else None
+
+		os.makedirs(self.directory, exist_ok=True)
+		fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".part")
+		try:
+			with os.fdopen(fd, "wb") as f:
+				received = 0
+				while (chunk := response.read(CHUNK_SIZE)):
+					received += len(chunk)
+					f.write(decompressor.decompress(chunk) if decompressor else chunk)
+					if progress:
+						progress(received, total)
+				if decompressor:
+					f.write(decompressor.flush())
+
+			if total is not None and received < total:
+				raise OSError(f"Download of {url} ended after {received} of {total} bytes")
+			body = _identity(os.stat(tmp))
+			os.replace(tmp, self.path(url))
+		except BaseException:
+			os.remove(tmp)
+			raise
+		return body
+
+	def _write_validators(self, url: str, validators: dict):
+		fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".part")
+		with os.fdopen(fd, "w") as f:
+			json.dump(validators, f)
+		os.replace(tmp, self.path(url) + ".json")
+
+def _identity(stat: os.stat_result) -> list[int]:
+	# tells a downloaded file from the one it replaced, as moving it into place keeps all three
+	return [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+
+_default: Fetcher | None = None
+_default_lock = threading.Lock()
+
+def default_fetcher() -> Fetcher:
+	'''
+	:returns: The `Fetcher` shared by the whole process, so every download reuses its connections.
+	'''
+
+	global _default
+	with _default_lock:
+		if _default is None:
+			_default = Fetcher()
+		return _default
+
+def fetch(url: str, progress: Callable[[int, int | None], None] | None = None, timeout: float | None = None) -> str:
+	'''
+	Downloads or revalidates a URL with the `default_fetcher`, see `Fetcher.fetch`.
+	:returns: The file holding the contents of the URL.
+	'''
+
+	return default_fetcher().fetch(url, progress, timeout)
@@ -1,15 +1,48 @@
 # im too lazy to add ReST comments to this, take it as it is
 
-from typing import Any
-from tabulator import validate_csv, tabulate
+from typing import TYPE_CHECKING, Any
 from tkinter import filedialog, messagebox, ttk
+import argparse
+import multiprocessing
 import os
+import queue
 import threading
+import time
 import tkinter as tk
-import classes
+
+START = time.perf_counter()
+
+# spreadsheets are loaded and tabulated in a worker process, and the modules the window itself needs load numpy, which takes longer than drawing it, so they are imported where used and preloaded in the background
+if TYPE_CHECKING:
+    import classes
 
 tea_info = {}
 
+POLL_INTERVAL = 20 # ms between drains of the worker's event queue
+SEND_INTERVAL = 0.05 # seconds between the batches of rounds the worker sends
+events = None # the event queue of `worker`
+worker = None # the process loading and tabulating the current spreadsheet
+rounds_ready = 0 # rounds received from the worker so far
+tabulating = False
+
+watched = None # the spreadsheet last loaded, followed by `watcher` while watch mode is on
+watcher = None # the process polling `watched`
+watch_events = None # the event queue of `watcher`
+watch_update = None # the last result sent by `watcher`, kept until no tabulation is running to show it
+
+i = 0 # the next round to show
+labels = []
+
+ROW_HEIGHT = 25
+COLUMNS = ("Candidate", "Weight", "Status")
+
+tag_options: dict[str, Any] = {
+    "unelected": {"background": "white"},
+    "elected": {"background": "#ccffcc"},
+    "reweighing": {"background": "#fff6cc"},
+    "disqualified": {"background": "#ffd6d6"}
+}
+
 class FieldsetFrame(tk.Frame):
     def __init__(self, parent, label_text="INPUT", fixed_height=None, **kwargs):
         super().__init__(parent, bg=kwargs.get("bg", "#f0f0f0"))
@@ -44,6 +77,96 @@ class FieldsetFrame(tk.Frame):
     def add_widget(self, widget):
         widget.grid(in_=self.inner_frame, row=0, column=0, sticky="nsew")
 
+class CandidateTable:
+    # rows of the candidate table as (name, weight, status, tag), shared by every view showing them
+    def __init__(self):
+        self.order: list[str] = []
+        self.rows: dict[str, tuple] = {}
+        self.focus = None
+        self.views = []
+
+    def __len__(self):
+        return len(self.order)
+
+    def reset(self, rows):
+        self.order = [row[0] for row in rows]
+        self.rows = {row[0]: row for row in rows}
+        self.focus = None
+        for view in self.views:
+            view.top = 0
+        self.refresh()
+
+    def apply(self, changes, promote=None):
+        # applies one round of (weight, status, tag) changes by name, then redraws the visible rows once
+        for name, change in changes.items():
+            self.rows[name] = (name, *change)
+        if promote:
+            self.order.remove(promote)
+            self.order.insert(0, promote)
+            self.focus = promote
+        self.refresh()
+
+    def refresh(self):
+        for view in self.views:
+            view.render()
+
+class VirtualTable:
+    # a Treeview holding only as many items as there are visible rows, which are refilled from the model as it scrolls
+    def __init__(self, parent, model, columns, visible=10, **kwargs):
+        self.model = model
+        self.visible = visible
+        self.top = 0
+        self.slots = []
+        self.rendered = []
+
+        self.tree = ttk.Treeview(parent, columns=columns, show="headings", height=visible, **kwargs)
+        self.scrollbar = ttk.Scrollbar(parent, orient="vertical", command=self.yview)
+
+        self.tree.bind("<MouseWheel>", lambda event: self.scroll(-1 if event.delta > 0 else 1))
+        self.tree.bind("<Button-4>", lambda _: self.scroll(-1))
+        self.tree.bind("<Button-5>", lambda _: self.scroll(1))
+
+        model.views.append(self)
+        self.tree.bind("<Destroy>", lambda _: self in model.views and model.views.remove(self))
+
+    def fit(self, height):
+        # resizes the view to as many rows as fit in the given pixel height, minus the heading
+        self.visible = max(1, height // ROW_HEIGHT - 1)
+        self.render()
+
+    def scroll(self, rows):
+        self.top += rows
+        self.render()
+        return "break"
+
+    def yview(self, *args):
+        if args[0] == "moveto":
+            self.top = round(float(args[1]) * len(self.model))
+        elif args[0] == "scroll":
+            self.top += int(args[1]) * (self.visible if args[2] == "pages" else 1)
+        self.render()
+
+    def render(self):
+        count = min(self.visible, len(self.model))
+        while len(self.slots) < count:
+            self.slots.append(self.tree.insert("", tk.END))
+            self.rendered.append(None)
+        while len(self.slots) > count:
+            self.tree.delete(self.slots.pop())
+            self.rendered.pop()
+
+        self.top = max(0, min(self.top, len(self.model) - count))
+        for slot, name in enumerate(self.model.order[self.top:self.top + count]):
+            row = self.model.rows[name]
+            if self.rendered[slot] != row:
+                self.tree.item(self.slots[slot], values=row[:3], tags=(row[3],))
+                self.rendered[slot] = row
+            if name == self.model.focus:
+                self.tree.focus(self.slots[slot])
+
+        total = max(1, len(self.model))
+        self.scrollbar.set(self.top / total, min(1.0, (self.top + count) / total))
+
 def add_placeholder(entry, placeholder):
     def on_focus_in(_):
         if entry.get() == placeholder:
@@ -60,41 +183,57 @@ def add_placeholder(entry, placeholder):
     entry.bind("<FocusIn>", on_focus_in)
     entry.bind("<FocusOut>", on_focus_out)
 
-root = tk.Tk()
-root.title("TEAbulator")
-root.geometry("600x550")
-root.configure(bg="#f0f0f0")
-root.resizable(False, False)
-
-ICON = tk.PhotoImage(file="assets/icon.png")
-root.wm_iconphoto(False, ICON)
-
-style = ttk.Style()
-style.configure("Custom.TFrame", background="#f0f0f0")
-style.configure("Custom.Placeholder.TEntry", foreground="gray")
-style.configure("Custom.Treeview", rowheight=25, borderwidth=1, relief="solid", font=("Arial", 10, "bold"))
-
-container = tk.Frame(root)
-container.pack(fill="x", expand=False)
-
-input_fs = FieldsetFrame(container, label_text="Input", fixed_height=82)
+table = CandidateTable()
 
-f1 = tk.Frame(container, bg="#f0f0f0")
-f1.pack(side="right", anchor="n", padx=(0, 10), pady=(5, 0))
-
-load_from_url = ttk.Button(f1, text="Load from URL", width=20)
-load_from_file = ttk.Button(f1, text="Load from file", width=20)
-load_from_url.pack(pady=5)
-load_from_file.pack(pady=(5, 0))
-
-input_fs.pack(side="top", fill="x", expand=False)
+def preload():
+    # runs off the main thread once the window is shown, so the first spreadsheet does not wait for this import
+    import classes
 
 def begin_tabulation(file_or_url):
-    try:
-        file_or_url = validate_csv(file_or_url)
-        tabulate_(file_or_url)
-    except Exception as e:
-        messagebox.showerror("Error", str(e))
+    global events, worker, rounds_ready, tabulating
+
+    cancel_tabulation()
+
+    # spawned rather than forked, so the worker does not inherit the window and starts the same way on every platform
+    context = multiprocessing.get_context("spawn")
+    events = context.Queue()
+    worker = context.Process(target=tabulation_worker, args=(file_or_url, events), daemon=True)
+    worker.start()
+
+    rounds_ready = 0
+    tabulating = True
+    cancel.state(["!disabled"])
+    tabulation_progress.configure(mode="indeterminate")
+    tabulation_progress.start()
+    drain_events(events, file_or_url)
+
+def stop_worker():
+    global events, worker
+
+    if worker is not None:
+        worker.terminate() # does nothing if it has already exited
+        worker.join()
+    events = None
+    worker = None
+
+    tabulation_progress.stop()
+    tabulation_progress.configure(mode="determinate")
+    cancel.state(["disabled"])
+
+def cancel_tabulation():
+    # also drops whatever was shown, so nothing of the previous spreadsheet is kept alive, including its watcher
+    global tea_info, rounds_ready, tabulating, watched
+
+    stop_worker()
+    stop_watch()
+    watched = None
+    tea_info = {}
+    rounds_ready = 0
+    tabulating = False
+    tabulation_progress["value"] = 0
+
+    reset()
+    set_info()
 
 def open_url():
     for widget in input_fs.inner_frame.winfo_children():
@@ -111,7 +250,7 @@ def open_url():
     entry.bind("<Return>", on_enter)
 
 def open_file():
-    filename = filedialog.askopenfilename(title="Select a file", filetypes=[("CSV Files", "*.csv")], parent=root)
+    filename = filedialog.askopenfilename(title="Select a file", filetypes=[("Elections", "*.csv *.arrow"), ("CSV Files", "*.csv"), ("Election Files", "*.arrow")], parent=root)
     if filename:
         dispname = os.path.basename(filename)
         for widget in input_fs.inner_frame.winfo_children():
@@ -123,31 +262,6 @@ def open_file():
 
         begin_tabulation(filename)
 
-load_from_url["command"] = open_url
-load_from_file["command"] = open_file
-open_url()
-
-labels = []
-
-info_container = tk.Frame(root, bg="#f0f0f0")
-info_container.pack(fill="x", padx=10, pady=(2, 7))
-
-long_row = tk.Frame(info_container, height=35, bg="white", highlightbackground="gray", highlightthickness=2)
-long_label = tk.Label(long_row, text="Threshold", bg=long_row["bg"], font=("Arial", 14, "bold"))
-long_label.place(relx=0.5, rely=0.5, anchor="center")
-labels.append(long_label)
-long_row.pack(fill="x")
-
-short_row = tk.Frame(info_container, bg="#f0f0f0")
-short_row.pack(fill="x")
-
-for i, text in enumerate(["Quota", "Seats"]):
-    frame = tk.Frame(short_row, height=35, bg="white", highlightbackground="gray", highlightthickness=2)
-    label = tk.Label(frame, text=text, bg=frame["bg"], font=("Arial", 14, "bold"))
-    label.place(relx=0.5, rely=0.5, anchor="center")
-    labels.append(label)
-    frame.pack(side="left", expand=True, fill="both", pady=(2, 0), padx=(0, 1) if i == 0 else (1, 0))
-
 def set_info(threshold="", quota="", seats=""):
     texts = [
         f"Threshold = {threshold} | Round 0" if threshold else "Threshold | Round",
@@ -157,38 +271,6 @@ def set_info(threshold="", quota="", seats=""):
     for i, text in enumerate(texts):
         labels[i].config(text=text)
 
-set_info()
-
-data_fs = FieldsetFrame(root, label_text="Data")
-data_fs.pack(side="top", fill="x", expand=False)
-
-row_ids = {}
-
-tree = ttk.Treeview(data_fs.inner_frame, columns=("Candidate", "Weight", "Status"), style="Custom.Treeview", show="headings")
-tree.grid(row=0, column=0)
-
-sb = ttk.Scrollbar(data_fs.inner_frame, orient="vertical", command=tree.yview)
-sb.grid(row=0, column=1, sticky="ns")
-tree.config(yscrollcommand=sb.set)
-
-tree.heading("Candidate", text="Candidate", anchor="center")
-tree.heading("Weight", text="Weight", anchor="center")
-tree.heading("Status", text="Status", anchor="center")
-
-tree.column("Candidate", anchor="center", width=240, stretch=False)
-tree.column("Weight", anchor="center", width=100, stretch=False)
-tree.column("Status", anchor="center", width=215, stretch=False)
-
-tag_options: dict[str, Any] = {
-    "unelected": {"background": "white"},
-    "elected": {"background": "#ccffcc"},
-    "reweighing": {"background": "#fff6cc"},
-    "disqualified": {"background": "#ffd6d6"}
-}
-
-for name, options in tag_options.items():
-    tree.tag_configure(name, **options)
-
 def enlarge_table():
     popup = tk.Toplevel(root)
     popup.title("Data")
@@ -196,23 +278,110 @@ def enlarge_table():
     popup.wm_iconphoto(False, ICON)
     popup.grab_set()
 
-    enlarged_tree = ttk.Treeview(popup, columns=("Candidate", "Weight", "Status"), style="Custom.Treeview", show="headings")
+    enlarged_view = VirtualTable(popup, table, COLUMNS, style="Custom.Treeview")
+    enlarged_tree = enlarged_view.tree
+    enlarged_view.scrollbar.pack(side="right", fill="y")
     enlarged_tree.pack(fill="both", expand=True)
+    enlarged_tree.bind("<Configure>", lambda event: enlarged_view.fit(event.height), add="+")
 
-    for col in ("Candidate", "Weight", "Status"):
+    for col in COLUMNS:
         enlarged_tree.heading(col, text=col, anchor="center")
         enlarged_tree.column(col, anchor="center", stretch=True)
 
-    for item_id in tree.get_children():
-        values = tree.item(item_id)["values"]
-        tags = tree.item(item_id)["tags"]
-        enlarged_tree.insert("", "end", values=values or (), tags=tags)
-
     for name, options in tag_options.items():
         enlarged_tree.tag_configure(name, **options)
 
-menu = tk.Menu(root, tearoff=0)
-menu.add_command(label="Full View", command=enlarge_table)
+    enlarged_view.render()
+
+def show_stats():
+    stats = tea_info.get("stats")
+    if stats:
+        messagebox.showinfo("Statistics", stats.summary(), parent=root)
+    elif tea_info.get("rounds"):
+        messagebox.showinfo("Statistics", "This result was loaded from the cache, so no statistics were recorded.", parent=root)
+    else:
+        messagebox.showinfo("Statistics", "Nothing has been tabulated yet.", parent=root)
+
+def toggle_watch():
+    global watcher, watch_events
+
+    stop_watch()
+    if watch_var.get() and watched:
+        # polled in its own process like a tabulation, so the network and the tabulations of each poll neither freeze the window nor contend with it for the GIL
+        context = multiprocessing.get_context("spawn")
+        watch_events = context.Queue()
+        watcher = context.Process(target=watch_worker, args=(watched, watch_events), daemon=True)
+        watcher.start()
+        collect_watch(watch_events)
+
+def stop_watch():
+    global watcher, watch_events, watch_update
+
+    if watcher is not None:
+        watcher.terminate()
+        watcher.join()
+    watcher = None
+    watch_events = None
+    watch_update = None
+
+def watch_worker(file_or_url, events):
+    # sends the flattened rounds of every changed result, like `tabulation_worker`, until it is terminated
+    from watch import DEFAULT_INTERVAL, ElectionWatcher
+
+    try:
+        watcher_ = ElectionWatcher(file_or_url)
+    except Exception as e:
+        events.put(("error", str(e)))
+        return
+
+    # the first result is the spreadsheet already shown, only tabulated again with other random tie fallbacks, so it is kept as the baseline rather than sent
+    baseline = True
+    while True:
+        try:
+            result = watcher_.poll()
+            if result and not baseline:
+                events.put(("result", watcher_.election.names, result["quota"], result["seats"], result["rounds"].to_arrays()))
+            baseline = watcher_.result is None
+        except Exception as e:
+            events.put(("error", str(e)))
+        time.sleep(DEFAULT_INTERVAL)
+
+def collect_watch(source):
+    global watch_update
+    import classes
+
+    if source is not watch_events:
+        return # watch mode was turned off, or another spreadsheet was loaded
+
+    exited = not watcher.is_alive() # checked before draining, so whatever it sent before exiting is read first
+    try:
+        while True:
+            event, *args = source.get_nowait()
+            if event == "error":
+                messagebox.showerror("Error", f"Watched spreadsheet could not be updated:\n{args[0]}")
+            else:
+                watch_update = args
+    except queue.Empty:
+        pass
+
+    if watch_update and not tabulating:
+        # compared against what is shown rather than the last poll, so a result that arrived mid-tabulation is not lost
+        names, quota, seats, arrays = watch_update
+        watch_update = None
+        rounds = classes.RoundHistory.from_arrays([classes.Candidate(name, column=j) for j, name in enumerate(names)], arrays)
+        shown = tea_info.get("rounds")
+        if not shown or (tea_info.get("quota"), [c.name for c in shown.elected]) != (quota, [c.name for c in rounds.elected]):
+            show_tabulation(rounds, quota, seats)
+
+    if exited:
+        code = watcher.exitcode
+        stop_watch()
+        watch_var.set(False)
+        if code != 0:
+            messagebox.showerror("Error", f"Watching the spreadsheet stopped unexpectedly (exit code {code}).")
+        return
+
+    root.after(POLL_INTERVAL, collect_watch, source)
 
 def show_popup(event):
     menu.tk_popup(event.x_root, event.y_root)
@@ -221,61 +390,126 @@ def block_resize(event):
     if tree.identify_region(event.x, event.y) == "separator":
         return "break"
 
-tree.bind("<Button-1>", block_resize)
-tree.bind("<Motion>", block_resize)
-tree.bind("<Button-3>", show_popup)
-
 def reset():
-    for item in tree.get_children():
-        tree.delete(item)
-
-    row_ids.clear()
+    table.reset([])
 
     slider.state(["!disabled"])
     next_round.state(["disabled"])
     auto_round.state(["disabled"])
 
-def schedule_check(t):
-    root.after(1000, check_if_done, t)
-
-def check_if_done(t):
-    if not t.is_alive():
-        next_round.state(["!disabled"])
-        auto_round.state(["!disabled"])
-    else:
-        schedule_check(t)
-
-def tabulation_worker(source):
-    global i, tea_info
+def tabulation_worker(file_or_url, events):
+    # runs in its own process, so a heavy election neither stalls the window nor outlives a cancel, and its ballots are freed when it exits
+    # only the flattened rounds are sent back, in batches as they are recorded
+    import classes
+    from cache import ElectionCache, read_content
+    from tabulator import load_election, resolve_source, tabulate_iter
 
-    tea_info.clear()
-    tea_info = tabulate(source)
+    try:
+        election_cache = ElectionCache()
+        last = 0
+        def downloaded(received, total):
+            nonlocal last
+            if total and time.perf_counter() - last >= SEND_INTERVAL:
+                events.put(("download", received, total))
+                last = time.perf_counter()
+
+        content = read_content(resolve_source(file_or_url), downloaded)
+        key = election_cache.key(content, "python")
+
+        if (cached := election_cache.get(key)):
+            election, result = cached
+            events.put(("start", election.names, result["quota"], result["seats"], result["rounds"].to_arrays()))
+            events.put(("done", None))
+            return
+
+        election = load_election(content)
+        stats = classes.TabulationStats()
+        tabulation = tabulate_iter(election, stats=stats)
+        rounds = tabulation.rounds
+        events.put(("start", election.names, tabulation.quota, tabulation.seats, rounds.to_arrays()))
+
+        sent, last = len(rounds), time.perf_counter()
+        while tabulation.advance():
+            if time.perf_counter() - last >= SEND_INTERVAL:
+                events.put(("rounds", rounds.to_arrays(sent)))
+                sent, last = len(rounds), time.perf_counter()
+        if sent < len(rounds):
+            events.put(("rounds", rounds.to_arrays(sent)))
+
+        election_cache.put(key, election, tabulation.result())
+        events.put(("done", stats))
+    except Exception as e:
+        events.put(("error", str(e)))
 
-    if (rounds := tea_info.get("rounds")):
-        i = 0
-        zero_round = rounds[0]
+def show_tabulation(rounds, quota, seats):
+    global i, tea_info, rounds_ready
 
-        reset()
-        for candidate in zero_round.unelected:
-            row_ids[candidate.name] = tree.insert("", tk.END, values=(candidate.name, zero_round.weights[candidate.name], "Unelected"))
+    tea_info = {"rounds": rounds, "quota": quota, "seats": seats}
+    rounds_ready = len(rounds)
+    i = 1 # round 0 is shown as soon as the table is filled
+    zero_round = rounds[0]
 
-        rounds.pop(0)
+    reset()
+    table.reset([(candidate.name, zero_round.weights[candidate.name], "Unelected", "unelected") for candidate in zero_round.unelected])
+    set_info("5", quota, seats)
+    next_round.state(["!disabled"])
+    auto_round.state(["!disabled"])
 
-    if (quota := tea_info.get("quota")) and (seats := tea_info.get("seats")):
-        set_info("5", quota, seats)
+def drain_events(source, file_or_url):
+    global rounds_ready, tabulating, watched
+    import classes
 
-def tabulate_(source):
-    t = threading.Thread(target=tabulation_worker, args=(source,))
-    t.start()
-    schedule_check(t)
+    if source is not events:
+        return # cancelled, or a newer tabulation has taken over
 
-control_fs = FieldsetFrame(root, label_text="Controls")
-control_fs.pack(fill="x", expand=False)
+    exited = not worker.is_alive() # checked before draining, so whatever it sent before exiting is read first
+    try:
+        while True:
+            event, *args = source.get_nowait()
+            if event == "start":
+                names, quota, seats, arrays = args
+                # the candidates only carry their names, the ballots stay in the worker
+                rounds = classes.RoundHistory.from_arrays([classes.Candidate(name, column=j) for j, name in enumerate(names)], arrays)
+                show_tabulation(rounds, quota, seats)
+
+                tabulation_progress.stop()
+                tabulation_progress.configure(mode="determinate", maximum=seats)
+            elif event == "download":
+                received, total = args
+                tabulation_progress.stop()
+                tabulation_progress.configure(mode="determinate", maximum=total, value=received)
+            elif event == "rounds":
+                tea_info["rounds"].extend(args[0])
+                rounds_ready = len(tea_info["rounds"])
+            elif event == "done":
+                tea_info["stats"] = args[0]
+                tabulating = False
+                stop_worker()
+                tabulation_progress["value"] = tabulation_progress["maximum"]
+
+                watched = file_or_url
+                toggle_watch()
+                if i >= rounds_ready:
+                    finish_rounds()
+                return
+            elif event == "error":
+                cancel_tabulation()
+                messagebox.showerror("Error", args[0])
+                return
+
+            if event in ("start", "rounds"):
+                tabulation_progress["value"] = len(tea_info["rounds"].elected)
+    except queue.Empty:
+        pass
+
+    if exited:
+        # it was killed or crashed without reporting, e.g. out of memory
+        code = worker.exitcode
+        cancel_tabulation()
+        messagebox.showerror("Error", f"The tabulation stopped unexpectedly (exit code {code}).")
+        return
 
-layout = ttk.Frame(control_fs.inner_frame)
-layout.grid(row=0, column=0, sticky="nsew")
-layout.columnconfigure(0, weight=1)
-layout.columnconfigure(1, weight=0)
+    root.after(POLL_INTERVAL, drain_events, source, file_or_url)
 
 def disable_inputs():
     load_from_file.state(["disabled"])
@@ -285,7 +519,6 @@ def enable_inputs():
     load_from_file.state(["!disabled"])
     load_from_url.state(["!disabled"])
 
-i = 0
 def advance_to_next_round():
     global i
 
@@ -293,40 +526,38 @@ def advance_to_next_round():
 
     if not rounds:
         return
+    if i >= rounds_ready:
+        return tabulating # the worker has not recorded the next round yet, auto update keeps waiting for it
 
     _round: classes.TabulationRound = rounds[i]
-    round_number = i + 1
+    round_number = i
 
-    for candidate in _round.unelected:
-        rid = row_ids[candidate.name]
-        tree.item(rid, tags=("unelected",), values=(candidate.name, f"{_round.weights[candidate.name]:.4f}", "Unelected"))
+    changes = {candidate.name: (f"{_round.weights[candidate.name]:.4f}", "Unelected", "unelected") for candidate in _round.unelected}
 
     if _round.elected:
-        rid = row_ids[_round.elected.name]
-        tree.item(rid, tags=("elected",), values=(_round.elected.name, f"{_round.weights[_round.elected.name]:.4f}", f"Elected (threshold = {_round.threshold})"))
-        tree.move(rid, "", 0)
-        tree.focus(rid)
-    elif _round.reweighing:
+        changes[_round.elected.name] = (f"{_round.weights[_round.elected.name]:.4f}", f"Elected (threshold = {_round.threshold})", "elected")
+        table.apply(changes, promote=_round.elected.name)
+    else:
         for candidate in _round.reweighing:
-            rid = row_ids[candidate.name]
-            tree.item(rid, tags=("reweighing",), values=(candidate.name, f"{_round.weights[candidate.name]:.4f}", "Reweighting"))
+            changes[candidate.name] = (f"{_round.weights[candidate.name]:.4f}", "Reweighting", "reweighing")
+        table.apply(changes)
 
     tree.update_idletasks()
     labels[0].config(text=f"Threshold = {_round.threshold} | Round {round_number}")
     i += 1
 
-    if i == len(rounds):
-        next_round.state(["disabled"])
-        auto_round.state(["disabled"])
-        eliminate_remaining()
+    if i == rounds_ready and not tabulating:
+        finish_rounds()
         return False
     return True
 
+def finish_rounds():
+    next_round.state(["disabled"])
+    auto_round.state(["disabled"])
+    eliminate_remaining()
+
 def eliminate_remaining():
-    for item in tree.get_children():
-        values = tree.item(item)["values"]
-        if values[2] == "Unelected":
-            tree.item(item, tags=("disqualified",), values=(values[0], values[1], "Disqualified"))
+    table.apply({name: (weight, "Disqualified", "disqualified") for (name, weight, status, _) in table.rows.values() if status == "Unelected"})
 
 def disable_then_auto_update():
     next_round.state(["disabled"])
@@ -349,26 +580,143 @@ def update_progress(step):
     progress["value"] = step
     root.after(1000, lambda: update_progress(step + 1))
 
-next_round = ttk.Button(layout, text="Next Round", state="disabled", command=advance_to_next_round)
-next_round.grid(row=0, column=1, sticky="e", padx=5, pady=(5, 2))
-
-auto_round = ttk.Button(layout, text="Auto Round", state="disabled", command=disable_then_auto_update)
-auto_round.grid(row=1, column=1, sticky="e", padx=5, pady=(2, 5))
-
-progress = ttk.Progressbar(layout, maximum=1, length=100, mode="determinate")
-progress.grid(row=0, column=0, sticky="e", padx=5)
-
-slider_var = tk.IntVar()
 def on_slider_move(value):
     rounded = round(float(value))
     slider_var.set(rounded)
     progress.config(maximum=rounded)
 
-slider = ttk.Scale(layout, from_=1, to=5, orient="horizontal", variable=slider_var, command=on_slider_move)
-slider.grid(row=1, column=0, sticky="e", padx=(5, 10), pady=(2, 5))
+def main(argv=None):
+    global root, ICON, input_fs, load_from_url, load_from_file, tree, watch_var, menu, next_round, auto_round, progress, slider_var, slider, tabulation_progress, cancel
+
+    parser = argparse.ArgumentParser(description="Shows a TEA election round by round.")
+    parser.add_argument("--startup-time", action="store_true", help="print how many seconds it took to show the window, then exit")
+    args = parser.parse_args(argv)
+
+    root = tk.Tk()
+    root.title("TEAbulator")
+    root.geometry("600x550")
+    root.configure(bg="#f0f0f0")
+    root.resizable(False, False)
+
+    ICON = tk.PhotoImage(file="assets/icon.png")
+    root.wm_iconphoto(False, ICON)
+
+    style = ttk.Style()
+    style.configure("Custom.TFrame", background="#f0f0f0")
+    style.configure("Custom.Placeholder.TEntry", foreground="gray")
+    style.configure("Custom.Treeview", rowheight=ROW_HEIGHT, borderwidth=1, relief="solid", font=("Arial", 10, "bold"))
+
+    container = tk.Frame(root)
+    container.pack(fill="x", expand=False)
+
+    input_fs = FieldsetFrame(container, label_text="Input", fixed_height=82)
+
+    f1 = tk.Frame(container, bg="#f0f0f0")
+    f1.pack(side="right", anchor="n", padx=(0, 10), pady=(5, 0))
+
+    load_from_url = ttk.Button(f1, text="Load from URL", width=20)
+    load_from_file = ttk.Button(f1, text="Load from file", width=20)
+    load_from_url.pack(pady=5)
+    load_from_file.pack(pady=(5, 0))
+
+    input_fs.pack(side="top", fill="x", expand=False)
+
+    load_from_url["command"] = open_url
+    load_from_file["command"] = open_file
+    open_url()
+
+    info_container = tk.Frame(root, bg="#f0f0f0")
+    info_container.pack(fill="x", padx=10, pady=(2, 7))
+
+    long_row = tk.Frame(info_container, height=35, bg="white", highlightbackground="gray", highlightthickness=2)
+    long_label = tk.Label(long_row, text="Threshold", bg=long_row["bg"], font=("Arial", 14, "bold"))
+    long_label.place(relx=0.5, rely=0.5, anchor="center")
+    labels.append(long_label)
+    long_row.pack(fill="x")
+
+    short_row = tk.Frame(info_container, bg="#f0f0f0")
+    short_row.pack(fill="x")
+
+    for i, text in enumerate(["Quota", "Seats"]):
+        frame = tk.Frame(short_row, height=35, bg="white", highlightbackground="gray", highlightthickness=2)
+        label = tk.Label(frame, text=text, bg=frame["bg"], font=("Arial", 14, "bold"))
+        label.place(relx=0.5, rely=0.5, anchor="center")
+        labels.append(label)
+        frame.pack(side="left", expand=True, fill="both", pady=(2, 0), padx=(0, 1) if i == 0 else (1, 0))
+
+    set_info()
+
+    data_fs = FieldsetFrame(root, label_text="Data")
+    data_fs.pack(side="top", fill="x", expand=False)
+
+    table_view = VirtualTable(data_fs.inner_frame, table, COLUMNS, style="Custom.Treeview")
+    tree = table_view.tree
+    tree.grid(row=0, column=0)
+    table_view.scrollbar.grid(row=0, column=1, sticky="ns")
+
+    tree.heading("Candidate", text="Candidate", anchor="center")
+    tree.heading("Weight", text="Weight", anchor="center")
+    tree.heading("Status", text="Status", anchor="center")
+
+    tree.column("Candidate", anchor="center", width=240, stretch=False)
+    tree.column("Weight", anchor="center", width=100, stretch=False)
+    tree.column("Status", anchor="center", width=215, stretch=False)
+
+    for name, options in tag_options.items():
+        tree.tag_configure(name, **options)
+
+    watch_var = tk.BooleanVar()
+
+    menu = tk.Menu(root, tearoff=0)
+    menu.add_command(label="Full View", command=enlarge_table)
+    menu.add_command(label="Statistics", command=show_stats)
+    menu.add_checkbutton(label="Watch for New Responses", variable=watch_var, command=toggle_watch)
+
+    tree.bind("<Button-1>", block_resize)
+    tree.bind("<Motion>", block_resize)
+    tree.bind("<Button-3>", show_popup)
+
+    control_fs = FieldsetFrame(root, label_text="Controls")
+    control_fs.pack(fill="x", expand=False)
+
+    layout = ttk.Frame(control_fs.inner_frame)
+    layout.grid(row=0, column=0, sticky="nsew")
+    layout.columnconfigure(0, weight=1)
+    layout.columnconfigure(1, weight=0)
+    layout.columnconfigure(2, weight=0)
+
+    # seats filled by the worker so far
+    tabulation_progress = ttk.Progressbar(layout, maximum=1, length=150, mode="determinate")
+    tabulation_progress.grid(row=0, column=0, sticky="w", padx=5)
+
+    cancel = ttk.Button(layout, text="Cancel", state="disabled", command=cancel_tabulation)
+    cancel.grid(row=1, column=0, sticky="w", padx=5, pady=(2, 5))
+
+    next_round = ttk.Button(layout, text="Next Round", state="disabled", command=advance_to_next_round)
+    next_round.grid(row=0, column=2, sticky="e", padx=5, pady=(5, 2))
+
+    auto_round = ttk.Button(layout, text="Auto Round", state="disabled", command=disable_then_auto_update)
+    auto_round.grid(row=1, column=2, sticky="e", padx=5, pady=(2, 5))
+
+    progress = ttk.Progressbar(layout, maximum=1, length=100, mode="determinate")
+    progress.grid(row=0, column=1, sticky="e", padx=5)
+
+    slider_var = tk.IntVar()
+    slider = ttk.Scale(layout, from_=1, to=5, orient="horizontal", variable=slider_var, command=on_slider_move)
+    slider.grid(row=1, column=1, sticky="e", padx=(5, 10), pady=(2, 5))
+
+    ttk.Label(layout, text="1").place(in_=slider, relx=0.0, rely=1.0, anchor="nw")
+    ttk.Label(layout, text="5").place(in_=slider, relx=1.0, rely=1.0, anchor="ne")
+
+    if args.startup_time:
+        root.update()
+        print(f"{time.perf_counter() - START:.3f}")
+        root.destroy()
+        return
 
-ttk.Label(layout, text="1").place(in_=slider, relx=0.0, rely=1.0, anchor="nw")
-ttk.Label(layout, text="5").place(in_=slider, relx=1.0, rely=1.0, anchor="ne")
+    root.after_idle(lambda: threading.Thread(target=preload, daemon=True).start())
+    root.mainloop()
 
 if __name__ == "__main__":
-    root.mainloop()
\ No newline at end of file
+    multiprocessing.freeze_support() # lets the built executable start worker processes
+    main()
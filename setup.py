@@ -14,7 +14,7 @@ setup(
     options={
         "build_exe": {
             "packages": [],
-            "include_files": ["classes.py", "tabulator.py", "assets"],
+            "include_files": ["classes.py", "tabulator.py", "vectorized.py", "analysis.py", "cache.py", "batch.py", "watch.py", "fetch.py", "assets"],
             "includes": ["tkinter"]
         }
     }
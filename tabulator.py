@@ -1,13 +1,28 @@
-from types import NoneType
-import polars as pl
+from typing import TYPE_CHECKING, Callable
+import argparse
+import hashlib
+import json
+import numpy as np
 import re
 import classes
+import fetch
 import math
 import random
 import os
 
+# polars and the numpy engine are imported by the functions using them, as they take longer to load than the rest of the tabulator
+if TYPE_CHECKING:
+	import polars as pl
+
 GDOC_SPREADSHEET_PATTERN = re.compile(r"docs\.google\.com/spreadsheets/d/(.+)/\w+")
 IGNORED_COLUMNS = ["suit", "timestamp", "username"] # The stuff found in Google forms (timestamp) and for vote verification purposes (suit/username)
+ENGINES = ["python", "numpy", "fixed"]
+ENGINE_VERSION = "4" # bump whenever a change can alter tabulation results, so cached results are not reused
+BINARY_FORMAT = "teabulator-election"
+BINARY_VERSION = 1
+ARROW_MAGIC = b"ARROW1"
+STREAM_BYTES = 64 << 20 # spreadsheet files larger than this are streamed in batches by `load_election` when no batch size is given
+STREAM_BATCH_SIZE = 100_000
 
 def build_csv_url(url: str) -> str:
 	'''
@@ -22,246 +37,476 @@ def build_csv_url(url: str) -> str:
 
 	return f"https://docs.google.com/spreadsheets/d/{document_id.group(1)}/export?format=csv"
 
-def compute_n(ballots: list[classes.Ballot], quota: float, epilson=1e-6):
+def resolve_source(file_or_url: str) -> str:
+	'''
+	Checks that a spreadsheet file or URL exists, converting Google Sheets links into CSV download links.
+	:param file_or_url: The filename or Google Sheets document link of the spreadsheet.
+	:returns: The filename, or the CSV download link.
+	'''
+
+	if os.path.exists(file_or_url):
+		return file_or_url
+	elif re.search(GDOC_SPREADSHEET_PATTERN, file_or_url):
+		return build_csv_url(file_or_url)
+
+	raise FileNotFoundError(f"Invalid spreadsheet file or URL: {file_or_url}")
+
+def fetch_csv(url: str, timeout: float = fetch.DEFAULT_TIMEOUT) -> bytes:
+	'''
+	Downloads a CSV file, or only revalidates it if it was downloaded before (see `fetch.Fetcher`).
+	:param url: The CSV file URL, e.g. from `build_csv_url`.
+	:param timeout: The number of seconds to wait for the server.
+	:returns: The contents of the file.
+	'''
+
+	with open(fetch.fetch(url, timeout=timeout), "rb") as f:
+		return f.read()
+
+def compute_n(ballots: list[classes.Ballot], quota: float):
 	'''
 	Computes n such that the sum of min(w, n) for all ballots in a list is equal to one quota, where w is the weight of each ballot.
+	The weights are sorted once, and n is solved exactly from their prefix sums: with the j lightest ballots below n, the sum is `prefix_j + n * (len - j)`.
+	A grouped ballot counts as `count` ballots of its weight, which all fall on the same side of n.
 	:param ballots: The set of ballots.
 	:param quota: The value of one quota.
-	:param epilson: The degree of accuracy in finding n.
+	:returns: The value of n, or `quota` if the ballots do not add up to one quota.
 	'''
 
-	low = 0.0
-	high = quota
+	weights = sorted([(b.weight, b.count) for b in ballots], key=lambda p: p[0]) # stable, so equal weights keep ballot order like `vectorized.compute_ns`
+	remaining = sum(count for (_, count) in weights)
+	prefix = 0.0
 
-	while (high - low) >= epilson:
-		n = (high + low) / 2
-		wsum = sum([min(n, b.weight) for b in ballots])
-		if wsum < quota:
-			low = n
-		else:
-			high = n
+	for w, count in weights:
+		n = (quota - prefix) / remaining
+		if n <= w:
+			return n
+		prefix += w * count
+		remaining -= count
 
-	return (high + low) / 2
+	return quota
 
 # Tie breaking functions
-def break_wsum_threshold(candidates: list[classes.Candidate], threshold: int):
+def _break_by(kind: str, candidates: list[classes.Candidate], threshold: int, aggregates: classes.TieBreakAggregates | None):
+	columns = [c.column for c in candidates]
+	if aggregates is None:
+		store = candidates[0].store
+		aggregates = classes.TieBreakAggregates(store.scores, store.weights, columns, threshold, store.counts)
+
+	sums = aggregates.lookup(kind, columns)
+	best = max(sums)
+	dupl = [candidate for (candidate, s) in zip(candidates, sums) if s == best]
+	return dupl[0] if len(dupl) <= 1 else dupl
+
+def break_wsum_threshold(candidates: list[classes.Candidate], threshold: int, aggregates: classes.TieBreakAggregates | None = None):
 	'''
 	Breaks between 2 or more canidates in terms of the largest total ballot weight a candidate has, where the ballots are above or equal to a threshold.
 	:param candidates: The list of candidates.
 	:param threshold: A specified threshold.
+	:param aggregates: The sums of the candidates tied this round, shared along the breaker chain. Computed for `candidates` if not given.
 	:returns: The succeeding candidate, or a list of candidates if tie-breaking between said candidates has failed.
 	'''
 
-	within_threshold = [[b for (b, s) in c.ballots if s >= threshold] for c in candidates]
-	find_sum = lambda l: sum([b.weight for b in l])
-	maxsum = max(within_threshold, key=find_sum)
-	dupl = [candidates[i] for i, l in enumerate(within_threshold) if find_sum(l) == find_sum(maxsum)]
-	return dupl[0] if len(dupl) <= 1 else dupl
+	return _break_by("wsum_threshold", candidates, threshold, aggregates)
 
-def break_weighted_scores(candidates: list[classes.Candidate], _):
+def break_weighted_scores(candidates: list[classes.Candidate], threshold: int, aggregates: classes.TieBreakAggregates | None = None):
 	'''
 	Breaks between 2 or more canidates in terms of the greatest sum of weighted scores a candidate has.
 	:param candidates: The list of candidates.
-	:param _: Parity argument, ignore
+	:param threshold: Parity argument, only used if `aggregates` is not given
+	:param aggregates: The sums of the candidates tied this round, shared along the breaker chain. Computed for `candidates` if not given.
 	:returns: The succeeding candidate, or a list of candidates if tie-breaking between said candidates has failed.
 	'''
 
-	find_wscore_sum = lambda c: sum([b.weight * s for (b, s) in c.ballots])
-	max_wscore_sum = max(candidates, key=find_wscore_sum)
-	dupl = [candidate for candidate in candidates if find_wscore_sum(candidate) == find_wscore_sum(max_wscore_sum)]
-	return dupl[0] if len(dupl) <= 1 else dupl
+	return _break_by("weighted_scores", candidates, threshold, aggregates)
 
-def break_unweighted_scores(candidates: list[classes.Candidate], _):
+def break_unweighted_scores(candidates: list[classes.Candidate], threshold: int, aggregates: classes.TieBreakAggregates | None = None):
 	'''
 	Breaks between 2 or more canidates in terms of the greatest sum of unweighted scores a candidate has.
 	:param candidates: The list of candidates.
-	:param _: Parity argument, ignore
+	:param threshold: Parity argument, only used if `aggregates` is not given
+	:param aggregates: The sums of the candidates tied this round, shared along the breaker chain. Computed for `candidates` if not given.
 	:returns: The succeeding candidate, or a list of candidates if tie-breaking between said candidates has failed.
 	'''
 
-	find_uscore_sum = lambda c: sum([s for (_, s) in c.ballots])
-	max_uscore_sum = max(candidates, key=find_uscore_sum)
-	dupl = [candidate for candidate in candidates if find_uscore_sum(candidate) == find_uscore_sum(max_uscore_sum)]
-	return dupl[0] if len(dupl) <= 1 else dupl
+	return _break_by("unweighted_scores", candidates, threshold, aggregates)
 
-def validate_csv(file_or_url: str):
+def _read_chunks(source: str | bytes, batch_size: int | None):
 	'''
-	Validates whether the given file or URL is a proper TEA ballots spreadsheet.
-	:param file_or_url: The filename or CSV file URL of the spreadsheet.
-	:returns: The given `file_or_url` value if valid.
+	Reads a spreadsheet with every column as strings, either whole or in batches of rows.
+	:param source: The filename or contents of the spreadsheet.
+	:param batch_size: The number of rows per batch, or `None` to read the spreadsheet at once. Only files can be batched.
+	:returns: A generator of data frames. When batching, the first one is empty and only carries the header.
 	'''
 
-	if not os.path.exists(file_or_url) and not re.search(GDOC_SPREADSHEET_PATTERN, file_or_url):
-		raise FileNotFoundError(f"Invalid spreadsheet file or URL: {file_or_url}")
-	elif re.search(GDOC_SPREADSHEET_PATTERN, file_or_url):
-		file_or_url = build_csv_url(file_or_url)
+	import polars as pl
 
-	df = pl.read_csv(file_or_url)
-	if len(df.columns) <= 1:
-		raise ValueError("Less than or 1 candidate(s) found")
+	if batch_size is None or not isinstance(source, str) or not os.path.exists(source):
+		yield pl.read_csv(source, infer_schema=False)
+		return
 
-	df = df.select(col for col in df.iter_columns() if not any(w in col.name.lower() for w in IGNORED_COLUMNS))
-	for rind, row in enumerate(df.iter_rows(), start=1):
-		for cind, item in enumerate(row, start=1):
-			if type(item) not in [NoneType, int]:
-				raise ValueError(f"Value of unrecognized type found: {item} (row {rind}, column {cind})")
-			elif item and item > 5:
-				raise ValueError(f"Integer outside 0-5 range found: {item} (row {rind}, column {cind})")
+	yield pl.DataFrame(schema=pl.scan_csv(source, infer_schema=False).collect_schema())
 
-	del df
-	return file_or_url
+	reader = pl.read_csv_batched(source, infer_schema_length=0, batch_size=batch_size)
+	while (batches := reader.next_batches(1)):
+		yield from batches
 
-def tabulate(file_or_url: str):
+def _validate_chunk(df: "pl.DataFrame", offset: int) -> list[tuple[int, int, str, bool]]:
 	'''
-	The meat and potatoes of this whole file, the tabulator
-	:param file_or_url: The filename or CSV file URL of the spreadsheet.
-	:returns: A dictionary with `"rounds"`: a list of tabulation rounds, `"quota"`: the quota of the election and `"seats"`: how many seats there will be in the election based on the number of ballots.
+	Finds every invalid cell in a chunk of string-typed score columns, checking all of them with column expressions.
+	:param df: The chunk, holding only score columns.
+	:param offset: The number of rows before this chunk.
+	:returns: A `(row, column, item, is_integer)` tuple for each invalid cell, with rows and columns counted from 1.
 	'''
 
-	file_or_url = validate_csv(file_or_url)
-	
-	df = pl.read_csv(file_or_url)
-	df = df.select(col for col in df.iter_columns() if not any(w in col.name.lower() for w in IGNORED_COLUMNS))
+	import polars as pl
 
-	central_ballots: list[classes.Ballot] = []
-	candidates: list[classes.Candidate] = []
+	if df.height == 0:
+		return []
 
-	elected = []
-	threshold = 5
+	parsed = {name: pl.col(name).cast(pl.Int64, strict=False) for name in df.columns}
+	bad_cells = df.select(
+		pl.struct(
+			(pl.int_range(pl.len()) + offset + 1).filter(invalid).alias("row"),
+			pl.col(name).filter(invalid).alias("item"),
+			value.filter(invalid).is_not_null().alias("is_integer")
+		).implode().alias(name)
+		for name, value in parsed.items()
+		for invalid in [(pl.col(name).is_not_null() & value.is_null()) | (value < 0) | (value > 5)]
+	).row(0, named=True)
+
+	return [
+		(cell["row"], cind, cell["item"], cell["is_integer"])
+		for cind, cells in enumerate(bad_cells.values(), start=1) for cell in cells
+	]
 
-	for row in df.iter_rows():
-		central_ballots.append(classes.Ballot(weight=1.0, scores=list(row)))
+def load_election(file_or_url: str | bytes, batch_size: int | None = None, progress: Callable[[int], None] | None = None, first_row: int = 0) -> classes.BallotMatrix:
+	'''
+	Reads and validates a TEA ballots spreadsheet in one pass, checking every cell with column expressions.
+	:param file_or_url: The filename or CSV file URL of the spreadsheet, or its contents as already read.
+	:param batch_size: If given, files are streamed in batches of this many rows, each validated and packed into the score matrix before the next is read. If not, files larger than `STREAM_BYTES` are streamed in batches of `STREAM_BATCH_SIZE` rows. URLs are downloaded to a file first.
+	:param progress: Called with the number of ballots read so far after each batch.
+	:param first_row: The number of ballots preceding these ones, so errors point at the right row when only the rows appended to a spreadsheet are loaded.
+	:returns: The validated ballot matrix, with `source` set to the location the spreadsheet was read from (`None` for contents).
+	'''
 
-	for i, col in enumerate(df.iter_columns()):
-		candidate = classes.Candidate(col.name.encode("ascii", "ignore").decode("ascii")) # remove emojis and weird stuff, gonna render some candidates with []
-		for ballot in central_ballots:
-			score = ballot.scores[i] or 0
-			candidate.ballots.append((ballot, score))
-		candidates.append(candidate)
+	import polars as pl
+
+	source = None
+	if isinstance(file_or_url, str):
+		file_or_url = source = resolve_source(file_or_url)
+		if not os.path.exists(file_or_url):
+			file_or_url = fetch.fetch(file_or_url)
+
+	if is_binary_election(file_or_url):
+		election = load_binary(file_or_url)
+		election.source = source
+		if progress:
+			progress(len(election.scores))
+		return election
+
+	if batch_size is None and isinstance(file_or_url, str) and os.path.getsize(file_or_url) > STREAM_BYTES:
+		batch_size = STREAM_BATCH_SIZE
+
+	names: list[str] | None = None
+	chunks: list[np.ndarray] = []
+	errors: list[tuple[int, int, str, bool]] = []
+	rows = first_row
+
+	for df in _read_chunks(file_or_url, batch_size):
+		if names is None:
+			if len(df.columns) <= 1:
+				raise ValueError("Less than or 1 candidate(s) found")
+			names = [name for name in df.columns if not any(w in name.lower() for w in IGNORED_COLUMNS)]
+
+		df = df.select(names)
+		errors += _validate_chunk(df, rows)
+
+		# once a cell is invalid the matrix is never returned, so stop packing and only keep validating
+		if not errors:
+			chunks.append(df.select(pl.all().cast(pl.Int64, strict=False).fill_null(0).cast(pl.Int8)).to_numpy(order="c").reshape(df.height, df.width))
+
+		rows += df.height
+		if progress:
+			progress(rows)
+
+	if errors:
+		raise ValueError("\n".join(
+			f"Integer outside 0-5 range found: {item} (row {rind}, column {cind})" if is_integer else f"Value of unrecognized type found: {item} (row {rind}, column {cind})"
+			for (rind, cind, item, is_integer) in sorted(errors)
+		))
+
+	return classes.BallotMatrix(
+		names=[name.encode("ascii", "ignore").decode("ascii") for name in names], # remove emojis and weird stuff, gonna render some candidates with []
+		scores=np.concatenate(chunks) if len(chunks) > 1 else chunks[0],
+		source=source
+	)
+
+def _checksum(names: list[str], scores: np.ndarray) -> str:
+	digest = hashlib.sha256(json.dumps(names).encode())
+	digest.update(scores.data)
+	return digest.hexdigest()
+
+def is_binary_election(source: str | bytes) -> bool:
+	'''
+	:param source: The filename or URL of a spreadsheet, or its contents.
+	:returns: Whether the source is a local file or contents in the Arrow IPC format written by `export_election`.
+	'''
 
-	def within_threshold() -> list[classes.Candidate]:
-		within = []
-		for candidate in candidates:
-			if candidate in elected:
-				continue
+	if isinstance(source, bytes):
+		return source.startswith(ARROW_MAGIC)
+	if not os.path.isfile(source):
+		return False
+	with open(source, "rb") as f:
+		return f.read(len(ARROW_MAGIC)) == ARROW_MAGIC
 
-			ballot_thres = [b for (b, s) in candidate.ballots if s >= threshold]
-			total_weight = sum(b.weight for b in ballot_thres)
+def export_election(election: classes.BallotMatrix, path: str):
+	'''
+	Writes a validated ballot matrix to an Arrow IPC file, so it can be loaded again without parsing or validating it.
+	The scores are stored row by row as a single fixed-size int8 list column, laid out exactly like the C-ordered score matrix, and the column is named after a JSON header with the candidate names and a checksum of the file contents.
+	:param election: The validated ballot matrix.
+	:param path: The filename to write, conventionally ending in `.arrow`.
+	'''
 
-			if total_weight >= quota:
-				within.append(candidate)
+	import polars as pl
 
-		return within
+	scores = np.ascontiguousarray(election.scores if election.counts is None else np.repeat(election.scores, election.counts, axis=0), dtype=np.int8)
+	header = json.dumps({
+		"format": BINARY_FORMAT,
+		"version": BINARY_VERSION,
+		"names": election.names,
+		"checksum": _checksum(election.names, scores)
+	})
+	pl.DataFrame([pl.Series(header, scores, dtype=pl.Array(pl.Int8, scores.shape[1]))]).write_ipc(path)
+
+def load_binary(source: str | bytes) -> classes.BallotMatrix:
+	'''
+	Loads a ballot matrix written by `export_election`. Local files are memory-mapped, and the score matrix is a read-only view of the mapping rather than a copy.
+	Validation is skipped, as the file could only have been written from a validated election if its checksum matches.
+	:param source: The filename of the election file, or its contents.
+	:returns: The ballot matrix, with `source` set to the filename (`None` for contents).
+	'''
+
+	import polars as pl
+
+	df = pl.read_ipc(source, memory_map=True, rechunk=False)
+	try:
+		header = json.loads(df.columns[0]) if df.width == 1 else {}
+	except json.JSONDecodeError:
+		header = {}
 
-	elected_seats = min(math.floor(3.5 + len(central_ballots) / 11), 40)
-	quota = len(central_ballots) / elected_seats
+	if header.get("format") != BINARY_FORMAT:
+		raise ValueError("Not a TEAbulator election file")
+	if header.get("version") != BINARY_VERSION:
+		raise ValueError(f"Unsupported election file version: {header.get('version')} (expected {BINARY_VERSION})")
+
+	names: list[str] = header["names"]
+	column = df.to_series()
+	if column.dtype != pl.Array(pl.Int8, len(names)):
+		raise ValueError(f"Election file has scores of type {column.dtype}, expected {pl.Array(pl.Int8, len(names))}")
+
+	scores = column.to_numpy(allow_copy=False).reshape(len(column), len(names))
+	if _checksum(names, scores) != header["checksum"]:
+		raise ValueError("Election file checksum mismatch, the file is corrupted")
+
+	return classes.BallotMatrix(names, scores, source if isinstance(source, str) else None)
+
+def group_ballots(election: classes.BallotMatrix) -> classes.BallotMatrix:
+	'''
+	Merges ballots with identical scores into one row each, counting how many ballots it stands for in `counts`.
+	Identical ballots always share a weight, so the fixed engine tabulates the groups with exactly the results of the individual ballots, in less time and memory when many ballots are alike. The float engines refuse groups, as the weight of a group is rounded differently from the sum of its ballots, which can move a candidate across the quota.
+	:param election: A ballot matrix, which may already be grouped.
+	:returns: The grouped ballot matrix, with the groups in order of their first ballot.
+	'''
+
+	_, first, inverse = np.unique(election.scores, axis=0, return_index=True, return_inverse=True)
+	order = np.argsort(first)
+	counts = np.bincount(inverse.ravel(), weights=election.counts, minlength=len(first)).astype(np.int64)
+
+	return classes.BallotMatrix(
+		names=election.names,
+		scores=np.ascontiguousarray(election.scores[first[order]]),
+		source=election.source,
+		counts=counts[order]
+	)
+
+def validate_csv(file_or_url: str):
+	'''
+	Validates whether the given file or URL is a proper TEA ballots spreadsheet, or an election file written by `export_election`.
+	Prefer `load_election` where the ballots are needed afterwards, as this discards them.
+	:param file_or_url: The filename or CSV file URL of the spreadsheet.
+	:returns: The given `file_or_url` value if valid.
+	'''
+
+	return load_election(file_or_url).source
+
+def _tabulate_ballots(election: classes.BallotMatrix, stats: classes.TabulationStats | None = None, rng: random.Random | None = None):
+	'''
+	Ballot object tabulation engine, run step by step by `tabulate_iter`.
+	Yields `(rounds, quota, seats)` once the zero round is recorded, then `None` after each further round is recorded into `rounds`.
+	'''
+
+	choice = rng.choice if rng else random.choice
+
+	store = classes.BallotStore(election.names, election.scores, election.counts)
+	central_ballots = store.ballots
+	n_ballots = int(store.counts.sum())
+	candidates = store.candidates
+
+	elected = []
+	threshold = 5
+
+	tally = classes.ThresholdTally(candidates, threshold)
+
+	def within_threshold() -> list[classes.Candidate]:
+		return [c for c in candidates if c not in elected and tally[c] >= quota]
+
+	elected_seats = min(math.floor(3.5 + n_ballots / 11), 40)
+	quota = n_ballots / elected_seats
 	seats = elected_seats
 
 	tie_breakers = [break_wsum_threshold, break_weighted_scores, break_unweighted_scores]
-	rounds: list[classes.TabulationRound] = []
+	rounds = classes.RoundHistory(candidates, tally.totals, threshold)
+
+	if stats:
+		stats.lap("setup")
 
-	zero_round = classes.TabulationRound()
-	zero_round.weights = {c.name: float(sum([b.weight for (b, s) in c.ballots if s >= threshold])) for c in candidates}
-	zero_round.unelected = candidates
-	zero_round.threshold = 5
+	yield rounds, quota, seats
 
-	rounds.append(zero_round)
+	def solve(columns: list[int]) -> list[float]:
+		ballots = [candidates[j].ballots_at(threshold) for j in columns]
+		if stats:
+			stats.compute_n_calls += len(ballots)
+			stats.compute_n_ballots += sum(len(b_set) for b_set in ballots)
+		return [compute_n(b_set, quota) for b_set in ballots]
 
 	while threshold > 0:
+		if tally.threshold != threshold:
+			tally.rebuild(threshold)
+
+		ns = classes.NValueQueue(solve)
 		thresholded = within_threshold()
+
+		if stats:
+			stats.lap("threshold")
 		
 		while len(thresholded) > 0:
-			cur_round = classes.TabulationRound()
+			if stats:
+				stats.begin_round()
+
+			# only the n-values of candidates whose ballots were reweighted since they were last solved are computed again
+			n = ns.minimum([c.column for c in thresholded])
 
-			ballots = [[(b, s) for (b, s) in candidate.ballots if s >= threshold] for candidate in thresholded]
-			ns = [(i, compute_n([b for (b, _) in b_set], quota)) for i, b_set in enumerate(ballots)]
-			n = [(i, n) for (i, n) in ns if n == min(ns, key = lambda x: x[1])[1]]
+			if stats:
+				stats.lap("compute_n")
 
 			if len(n) > 1:
 				tied = [thresholded[i] for (i, _) in n]
-				i, n_val = random.choice(n)
+				aggregates = classes.TieBreakAggregates(store.scores, store.weights, [c.column for c in tied], threshold, store.counts)
+				i, n_val = choice(n)
 
 				for breaker in tie_breakers:
-					res = breaker(tied, threshold)
+					if stats:
+						stats.count_tie_break(breaker.__name__)
+					res = breaker(tied, threshold, aggregates)
 					if isinstance(res, list):
 						tied = res
 						continue
 					else:
 						i, n_val = next((i, val) for (i, val) in n if i == thresholded.index(res))
-						break					
+						break
+				else:
+					if stats:
+						stats.count_tie_break("random")
 			else:
 				i, n_val = n[0]
 
-			weights = {c.name: float(sum([b.weight for (b, _) in ballots[i]])) for i, c in enumerate(thresholded)}
-			weights.update({c.name: float(sum([b.weight for (b, s) in c.ballots if s >= threshold])) for c in candidates if c not in thresholded})
-			cur_round.weights = weights
+			if stats:
+				stats.lap("tie_break")
+
+			weights = list(tally.totals)
 
-			reweighing = []
 			candidate = thresholded[i]
-			for (b, _) in ballots[i]:
-				for ind, score in enumerate(b.scores):
-					if ind != i and candidates[i] not in reweighing + elected:
-						reweighing.append(candidates[i])
+			ballot_set = candidate.ballots_at(threshold)
+			# any ballot has a score for another column than `i`, so this is what looping over the scores of every ballot would find
+			reweighing = [candidates[i]] if len(candidates) > 1 and ballot_set and candidates[i] not in elected else []
+
+			ns.invalidate(tally.reweight(ballot_set, [b.weight - min(b.weight, n_val) for b in ballot_set]))
 
-				b.weight -= min(b.weight, n_val)
+			if stats:
+				stats.ballots_reweighted += len(ballot_set)
+				stats.lap("reweight")
 
 			elected_seats -= 1
 			if candidate not in elected:
 				elected.append(candidate)
 
-			cur_round.elected = candidate
-			cur_round.unelected = [c for c in candidates if c not in elected]
-			cur_round.threshold = threshold
-			
 			if len(reweighing) > 0:
-				faux_round = classes.TabulationRound()
-				faux_round.reweighing = reweighing
-				faux_round.threshold = threshold
-				faux_round.weights = weights
-				rounds.append(faux_round)
+				rounds.record(weights, threshold, reweighing=[c.column for c in reweighing])
+				yield
+			rounds.record(weights, threshold, elected=candidate.column)
+			yield
+
+			if stats:
+				stats.lap("history")
 
 			thresholded = within_threshold()
-			rounds.append(cur_round)
+
+			if stats:
+				stats.lap("threshold")
+				stats.end_round()
 
 		threshold -= 1
 
 	non_elected = [c for c in candidates if c not in elected]
 	if elected_seats > 0:
-		while elected_seats > 0:
-			cur_round = classes.TabulationRound()
+		while elected_seats > 0 and len(non_elected) > 0:
+			if stats:
+				stats.begin_round()
 
-			positive_ballots = [(i, [b for (b, s) in candidate.ballots if s > 0]) for i, candidate in enumerate(non_elected)]
-			weights = [(i, sum([b.weight for b in ballots])) for (i, ballots) in positive_ballots]
+			# the tally was last rebuilt at a threshold of 1, so it holds the weight of every positive score
+			weights = [(i, tally[candidate]) for i, candidate in enumerate(non_elected)]
 			weight = [i for (i, w) in weights if w == max(weights, key = lambda p: p[1])[1]]
 
+			if stats:
+				stats.lap("threshold")
+
 			if len(weight) > 1:
 				tied = [non_elected[i] for i in weight]
-				i = random.choice(weight)
+				aggregates = classes.TieBreakAggregates(store.scores, store.weights, [c.column for c in tied], threshold, store.counts)
+				i = choice(weight)
 
 				for breaker in tie_breakers:
-					res = breaker(tied, threshold)
+					if stats:
+						stats.count_tie_break(breaker.__name__)
+					res = breaker(tied, threshold, aggregates)
 					if isinstance(res, list):
 						tied = res
 						continue
 					else:
 						i = next(i for i in weight if i == non_elected.index(res))
-						break					
+						break
+				else:
+					if stats:
+						stats.count_tie_break("random")
 			else:
 				i = weight[0]
 
+			if stats:
+				stats.lap("tie_break")
+
 			candidate = non_elected[i]
-			_, ballots = positive_ballots[i]
-
-			weights = {non_elected[i].name: _sum for (i, _sum) in weights}
-			weights.update({c.name: float(sum([b.weight for (b, s) in c.ballots if s >= threshold])) for c in elected})
-			cur_round.weights = weights
-
-			reweighing = []
-			for ballot in ballots:
-				for ind, score in enumerate(ballot.scores):
-					if ind != i and candidates[i] not in reweighing + elected:
-						reweighing.append(candidates[i])
-				ballot.weight = 0
+			ballots = candidate.ballots_at(1)
+			total_weight = float(sum(b.weight * b.count for b in central_ballots))
+
+			weights = [total_weight if c in elected else w for (c, w) in zip(candidates, tally.totals)]
+
+			reweighing = [candidates[i]] if len(candidates) > 1 and ballots and candidates[i] not in elected else []
+
+			tally.reweight(ballots, [0.0] * len(ballots))
+
+			if stats:
+				stats.ballots_reweighted += len(ballots)
+				stats.lap("reweight")
 			
 			elected_seats -= 1
 			if candidate not in elected:
@@ -269,24 +514,92 @@ def tabulate(file_or_url: str):
 
 			non_elected = [c for c in candidates if c not in elected]
 
-			cur_round.elected = candidate
-			cur_round.unelected = non_elected
-			cur_round.threshold = threshold
-			cur_round.reweighing = reweighing
+			rounds.record(weights, threshold, elected=candidate.column, reweighing=[c.column for c in reweighing])
+			yield
+
+			if stats:
+				stats.lap("history")
+				stats.end_round()
+
+def tabulate_iter(election: str | classes.BallotMatrix, engine: str = "python", stats: classes.TabulationStats | None = None, rng: random.Random | None = None) -> classes.Tabulation:
+	'''
+	Starts a tabulation that decides its rounds lazily, as they are iterated over, so it can be displayed as it runs or abandoned once enough candidates are elected.
+	:param election: A ballot matrix from `load_election`, or the filename or CSV file URL of the spreadsheet to load.
+	:param engine: The tabulation engine to use, one of `ENGINES`. `"python"` walks ballot objects, `"numpy"` works on a dense score matrix (see `vectorized.tabulate_matrix`), and `"fixed"` does the same with fixed-point weights, whose results do not depend on the order of the ballots. Grouped ballot matrices (see `group_ballots`) can only be tabulated by `"fixed"`.
+	:param stats: If given, filled in with per-phase and per-round timings and hot path counters. Time spent by the caller between rounds is counted towards the next phase.
+	:param rng: The random generator used when tie-breaking fails, the `random` module itself if not given.
+	:returns: The tabulation, with its quota, seats and zero round already available.
+	'''
+
+	if engine not in ENGINES:
+		raise ValueError(f"Unknown tabulation engine: {engine} (expected one of {', '.join(ENGINES)})")
+
+	if stats:
+		stats.start()
+
+	if not isinstance(election, classes.BallotMatrix):
+		election = load_election(election)
+	if election.counts is not None and engine != "fixed":
+		raise ValueError(f"Grouped ballots can only be tabulated with the fixed engine, as the {engine} engine rounds the weight of a group differently from that of its ballots")
 
-			rounds.append(cur_round)
+	if stats:
+		stats.lap("load")
 
-	return {
-		"rounds": rounds,
-		"quota": quota,
-		"seats": seats
-	}
+	if engine in ("numpy", "fixed"):
+		import vectorized
+		steps = vectorized.tabulate_matrix(election.names, election.scores, stats, rng, election.counts, fixed_point=engine == "fixed")
+	else:
+		steps = _tabulate_ballots(election, stats, rng)
+
+	rounds, quota, seats = next(steps)
+	return classes.Tabulation(steps, rounds, quota, seats)
+
+def tabulate(election: str | classes.BallotMatrix, engine: str = "python", stats: classes.TabulationStats | None = None, rng: random.Random | None = None):
+	'''
+	The meat and potatoes of this whole file, the tabulator, running `tabulate_iter` to the end
+	:param election: A ballot matrix from `load_election`, or the filename or CSV file URL of the spreadsheet to load.
+	:param engine: The tabulation engine to use, one of `ENGINES`.
+	:param stats: If given, filled in with per-phase and per-round timings and hot path counters.
+	:param rng: The random generator used when tie-breaking fails, the `random` module itself if not given.
+	:returns: A dictionary with `"rounds"`: the tabulation rounds as a `classes.RoundHistory`, `"quota"`: the quota of the election and `"seats"`: how many seats there will be in the election based on the number of ballots.
+	'''
+
+	return tabulate_iter(election, engine, stats, rng).result()
 
 if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Tabulates a TEA election from a spreadsheet file or URL.")
+	parser.add_argument("--engine", choices=ENGINES, help="the tabulation engine to use, python by default and fixed with --group")
+	parser.add_argument("--stats", action="store_true", help="print timings and hot path counters after tabulating")
+	parser.add_argument("--no-cache", action="store_true", help="always load and tabulate from scratch instead of reusing cached results")
+	parser.add_argument("--group", action="store_true", help="tabulate identical ballots as one weighted group with the fixed engine, faster when many ballots are alike (implies --no-cache)")
+	parser.add_argument("--export", metavar="FILE", help="also write the validated election to a binary .arrow file, which loads without parsing or validation")
+	args = parser.parse_args()
+
+	engine = args.engine or ("fixed" if args.group else "python")
+	if args.group and engine != "fixed":
+		parser.error("--group needs --engine fixed, as the float engines round the weight of a group differently from that of its ballots")
+
 	file_or_url = input("Please enter a file path or a URL leading to a spreadsheet: ")
 	try:
-		file_or_url = validate_csv(file_or_url)
-		data = tabulate(file_or_url)
+		stats = classes.TabulationStats() if args.stats else None
+		if stats:
+			stats.start()
+
+		if args.no_cache or args.group:
+			election = load_election(file_or_url)
+			if args.group:
+				election = group_ballots(election)
+
+			if stats:
+				stats.lap("load")
+
+			data = tabulate(election, engine, stats)
+		else:
+			import cache
+			election, data = cache.tabulate_cached(file_or_url, engine, stats)
+
+		if args.export:
+			export_election(election, args.export)
 
 		rounds = data.get("rounds")
 		quota = data.get("quota")
@@ -299,10 +612,14 @@ if __name__ == "__main__":
 		print(f"Quota = {quota or 0:.6f}, seats = {seats}")
 
 		print(f"===== Elected =====")
-		print("\n".join('- ' + _round.elected.name for _round in rounds if _round.elected != None))
+		print("\n".join('- ' + candidate.name for candidate in rounds.elected))
 
 		print(f"=== Disqualified ===")
 		print("\n".join('- ' + candidate.name for candidate in latest_round.unelected))
 
+		if stats:
+			print(f"===== Statistics =====")
+			print(stats.summary() if stats.phases else "Loaded from the cache, run with --no-cache to collect statistics")
+
 	except Exception as e:
 		raise
\ No newline at end of file
@@ -0,0 +1,82 @@
+import gzip
+import http.server
+import os
+import sys
+import threading
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # the modules live at the repository root
+
+import fetch
+
+class SheetServer:
+	'''
+	Local stand-in for the Google Sheets CSV export, serving `body` at `/sheet.csv` over keep-alive HTTP/1.1.
+	`/redirect` redirects to the sheet like the export links do, and `/missing` answers 404.
+	'''
+
+	def __init__(self):
+		self.body = b""
+		self.etag: str | None = None
+		self.gzip = True
+		self.requests: list[tuple[str, dict[str, str]]] = [] # (path, headers) of each request
+		self.connections: set[tuple[str, int]] = set()
+
+		server = self
+		class Handler(http.server.BaseHTTPRequestHandler):
+			protocol_version = "HTTP/1.1"
+
+			def log_message(self, *args):
+				pass
+
+			def do_GET(self):
+				server.requests.append((self.path, dict(self.headers)))
+				server.connections.add(self.client_address)
+
+				if self.path == "/redirect":
+					self.send_response(307)
+					self.send_header("Location", "/sheet.csv")
+					self.send_header("Content-Length", "0")
+					self.end_headers()
+				elif self.path != "/sheet.csv":
+					self.send_response(404)
+					self.send_header("Content-Length", "0")
+					self.end_headers()
+				elif server.etag and self.headers.get("If-None-Match") == server.etag:
+					self.send_response(304)
+					self.send_header("ETag", server.etag)
+					self.end_headers()
+				else:
+					compressed = server.gzip and "gzip" in self.headers.get("Accept-Encoding", "")
+					body = gzip.compress(server.body) if compressed else server.body
+					self.send_response(200)
+					if compressed:
+						self.send_header("Content-Encoding", "gzip")
+					if server.etag:
+						self.send_header("ETag", server.etag)
+					self.send_header("Content-Length", str(len(body)))
+					self.end_headers()
+					self.wfile.write(body)
+
+		self.httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+		self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+		self.thread.start()
+
+	def url(self, path: str = "/sheet.csv") -> str:
+		return f"http://127.0.0.1:{self.httpd.server_port}{path}"
+
+	def close(self):
+		self.httpd.shutdown()
+		self.httpd.server_close()
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+	# every test gets its own result cache and downloads, and a fresh shared fetcher using them
+	monkeypatch.setenv("TEABULATOR_CACHE_DIR", str(tmp_path / "cache"))
+	monkeypatch.setattr(fetch, "_default", None)
+
+@pytest.fixture
+def sheet_server():
+	server = SheetServer()
+	yield server
+	server.close()
@@ -0,0 +1,44 @@
+from cache import ElectionCache
+import numpy as np
+import os
+import tabulator
+
+def cached(tmp_path) -> tuple[ElectionCache, str, dict]:
+	cache = ElectionCache(str(tmp_path / "cache"))
+	content = b"Timestamp,A,B,C\nt,5,0,3\nt,0,5,3\nt,4,4,0\n"
+	election = tabulator.load_election(content)
+	result = tabulator.tabulate(election)
+	key = cache.key(content, "python")
+	cache.put(key, election, result)
+	return cache, key, result
+
+def test_round_trip(tmp_path):
+	cache, key, result = cached(tmp_path)
+	election, hit = cache.get(key)
+	assert election.names == ["A", "B", "C"]
+	assert (hit["quota"], hit["seats"]) == (result["quota"], result["seats"])
+	assert np.array_equal(hit["rounds"].to_arrays()["elected"], result["rounds"].to_arrays()["elected"])
+
+def test_hit_evicted_by_another_process(tmp_path, monkeypatch):
+	# another worker sharing the cache removes the entry right after it was read
+	cache, key, _ = cached(tmp_path)
+	utime = os.utime
+	def evicted(path, *args, **kwargs):
+		os.remove(path)
+		utime(path, *args, **kwargs)
+
+	monkeypatch.setattr(os, "utime", evicted)
+	assert cache.get(key) is not None
+	assert cache.get(key) is None
+
+def test_evict_skips_entries_already_removed(tmp_path, monkeypatch):
+	cache, key, _ = cached(tmp_path)
+	cache.max_bytes = 0
+	remove = os.remove
+	def raced(path):
+		remove(path)
+		remove(path)
+
+	monkeypatch.setattr(os, "remove", raced)
+	cache.evict()
+	assert cache.get(key) is None
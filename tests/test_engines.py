@@ -0,0 +1,121 @@
+from benchmarks.generate import DISTRIBUTIONS, generate_election, write_csv
+import classes
+import numpy as np
+import pytest
+import random
+import tabulator
+
+SEEDS = range(12)
+
+def generated(tmp_path, seed: int, ballots: int = 300, candidates: int = 15) -> classes.BallotMatrix:
+	# cycles through the score distributions, with unbreakable ties in every other election so the random fallback is exercised too
+	df = generate_election(ballots, candidates, DISTRIBUTIONS[seed % len(DISTRIBUTIONS)], ties=seed % 2 * 2, seed=seed)
+	return tabulator.load_election(write_csv(df, str(tmp_path / f"election_{seed}.csv")))
+
+def matrix(scores: list[list[int]] | np.ndarray) -> classes.BallotMatrix:
+	scores = np.array(scores, dtype=np.int8)
+	return classes.BallotMatrix([f"C{j}" for j in range(scores.shape[1])], scores)
+
+def tabulate(election: classes.BallotMatrix, engine: str, seed: int = 0) -> dict:
+	return tabulator.tabulate(election, engine, rng=random.Random(seed))
+
+def assert_same_result(a: dict, b: dict):
+	assert (a["quota"], a["seats"]) == (b["quota"], b["seats"])
+	a, b = a["rounds"].to_arrays(), b["rounds"].to_arrays()
+	assert a.keys() == b.keys()
+	for key in a:
+		assert np.array_equal(a[key], b[key]), key
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_python_and_numpy_agree_bit_for_bit(tmp_path, seed):
+	election = generated(tmp_path, seed)
+	assert_same_result(tabulate(election, "python", seed), tabulate(election, "numpy", seed))
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_tallies_match_per_round_sums(tmp_path, monkeypatch, seed):
+	# small slate elections spread fractional weights over candidates sharing most of their ballots, so tallies that drifted elect other candidates
+	df = generate_election(50, 10, "slate", ties=seed % 2 * 2, seed=seed)
+	election = tabulator.load_election(write_csv(df, str(tmp_path / f"slate_{seed}.csv")))
+	results = [tabulate(election, engine, seed) for engine in ["python", "numpy"]]
+
+	def reweight(self, ballots, weights):
+		# the totals as every round summed them before tallies were kept, over all ballots of every candidate
+		for ballot, weight in zip(ballots, weights):
+			ballot.weight = weight
+		self.rebuild(self.threshold)
+		return list(range(len(self.candidates)))
+
+	monkeypatch.setattr(classes.ThresholdTally, "reweight", reweight)
+	summed = tabulate(election, "python", seed)
+	for result in results:
+		assert [c.column for c in result["rounds"].elected] == [c.column for c in summed["rounds"].elected]
+		assert_same_result(result, summed)
+		assert all(min(r.weights.values()) >= 0 for r in result["rounds"])
+
+@pytest.mark.parametrize("engine", tabulator.ENGINES)
+def test_no_ballots(engine):
+	result = tabulate(matrix(np.zeros((0, 4))), engine)
+	assert result["quota"] == 0
+	assert_same_result(result, tabulate(matrix(np.zeros((0, 4))), "python"))
+
+@pytest.mark.parametrize("seed", range(3))
+def test_more_seats_than_candidates(seed):
+	# 60 ballots fill 8 seats, so fill-up runs out of candidates
+	election = matrix(np.random.default_rng(seed).integers(0, 6, (60, 3)))
+	results = [tabulate(election, engine, seed) for engine in tabulator.ENGINES]
+	assert results[0]["seats"] == 8
+	assert len(results[0]["rounds"].elected) == 3
+	assert_same_result(results[0], results[1])
+	assert [c.column for c in results[2]["rounds"].elected] == [c.column for c in results[0]["rounds"].elected]
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_sparse_matches_dense(tmp_path, monkeypatch, seed):
+	election = generated(tmp_path, seed)
+	for engine in tabulator.ENGINES:
+		monkeypatch.setattr(classes, "SPARSE_DENSITY", 0.0)
+		dense = tabulate(election, engine, seed)
+		monkeypatch.setattr(classes, "SPARSE_DENSITY", 1.0)
+		assert_same_result(dense, tabulate(election, engine, seed))
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_fixed_grouped_matches_ungrouped(tmp_path, seed):
+	election = generated(tmp_path, seed)
+	grouped = tabulator.group_ballots(election)
+	assert grouped.counts.sum() == len(election.scores)
+	assert_same_result(tabulate(election, "fixed", seed), tabulate(grouped, "fixed", seed))
+
+@pytest.mark.parametrize("engine", ["python", "numpy"])
+def test_float_engines_refuse_groups(engine):
+	with pytest.raises(ValueError):
+		tabulate(tabulator.group_ballots(matrix([[5, 0], [5, 0], [0, 5]])), engine)
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_fixed_ignores_ballot_order(tmp_path, seed):
+	election = generated(tmp_path, seed)
+	shuffled = classes.BallotMatrix(election.names, np.random.default_rng(seed).permutation(election.scores))
+	assert_same_result(tabulate(election, "fixed", seed), tabulate(shuffled, "fixed", seed))
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_batched_and_binary_loads_match(tmp_path, seed):
+	election = generated(tmp_path, seed)
+	path = str(tmp_path / f"election_{seed}.csv")
+
+	batched = tabulator.load_election(path, batch_size=37)
+	assert batched.names == election.names
+	assert np.array_equal(batched.scores, election.scores)
+
+	tabulator.export_election(election, str(tmp_path / "election.arrow"))
+	binary = tabulator.load_election(str(tmp_path / "election.arrow"))
+	assert binary.names == election.names
+	assert np.array_equal(binary.scores, election.scores)
+	assert_same_result(tabulate(election, "numpy", seed), tabulate(binary, "numpy", seed))
+
+def test_fixed_last_seat_holds_remaining_quota():
+	# 40 ballots elect 7 seats with a quota of 40/7, which no multiple of 2^-32 hits, and all of them score C0 to C6 alike
+	# the weight left for the last of them is exactly one quota, so every engine has to elect it at the threshold of 5 rather than in fill-up
+	election = matrix([[5] * 7 + [4]] * 40)
+
+	for engine in tabulator.ENGINES:
+		rounds = tabulate(election, engine)["rounds"]
+		assert sorted(c.column for c in rounds.elected) == list(range(7))
+		assert rounds[-1].threshold == 5
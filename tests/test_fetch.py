@@ -0,0 +1,86 @@
+import fetch
+import os
+import pytest
+
+SHEET = b"Timestamp,A,B,C\r\n" + b"".join(b"t,%d,%d,%d\r\n" % (i % 6, i * 7 % 6, i * 5 % 6) for i in range(5000))
+
+def read(path: str) -> bytes:
+	with open(path, "rb") as f:
+		return f.read()
+
+@pytest.fixture
+def fetcher(tmp_path):
+	return fetch.Fetcher(str(tmp_path / "downloads"), timeout=10)
+
+def test_gzip_download_with_progress(sheet_server, fetcher):
+	sheet_server.body = SHEET
+	progress = []
+	path = fetcher.fetch(sheet_server.url(), lambda received, total: progress.append((received, total)))
+
+	assert read(path) == SHEET
+	assert sheet_server.requests[-1][1]["Accept-Encoding"] == "gzip"
+	received, total = progress[-1]
+	assert received == total < len(SHEET) # the progress counts compressed bytes
+
+def test_uncompressed_download(sheet_server, fetcher):
+	sheet_server.body = SHEET
+	sheet_server.gzip = False
+	assert read(fetcher.fetch(sheet_server.url())) == SHEET
+
+def test_redirect(sheet_server, fetcher):
+	sheet_server.body = SHEET
+	assert read(fetcher.fetch(sheet_server.url("/redirect"))) == SHEET
+	assert [path for (path, _) in sheet_server.requests] == ["/redirect", "/sheet.csv"]
+
+def test_unchanged_sheet_is_revalidated(sheet_server, fetcher):
+	sheet_server.body = SHEET
+	sheet_server.etag = '"v1"'
+	first = fetcher.fetch(sheet_server.url())
+
+	progress = []
+	assert fetcher.fetch(sheet_server.url(), lambda received, total: progress.append(received)) == first
+	assert sheet_server.requests[-1][1]["If-None-Match"] == '"v1"'
+	assert progress == [] # answered with an empty 304
+	assert read(first) == SHEET
+
+def test_changed_sheet_is_downloaded_again(sheet_server, fetcher):
+	sheet_server.body = SHEET
+	sheet_server.etag = '"v1"'
+	fetcher.fetch(sheet_server.url())
+
+	sheet_server.body = SHEET + b"t,5,5,5\r\n"
+	sheet_server.etag = '"v2"'
+	assert read(fetcher.fetch(sheet_server.url())) == sheet_server.body
+
+def test_validators_of_another_body_are_not_sent(sheet_server, fetcher):
+	# two processes fetched the sheet at once, and the older body was moved into place after the newer one, next to the newer ETag
+	sheet_server.body = SHEET
+	sheet_server.etag = '"v1"'
+	stale = read(fetcher.fetch(sheet_server.url()))
+
+	sheet_server.body = SHEET + b"t,5,5,5\r\n"
+	sheet_server.etag = '"v2"'
+	path = fetcher.fetch(sheet_server.url())
+	with open(path + ".part", "wb") as f:
+		f.write(stale)
+	os.replace(path + ".part", path)
+
+	assert read(fetcher.fetch(sheet_server.url())) == sheet_server.body
+	assert "If-None-Match" not in sheet_server.requests[-1][1]
+	fetcher.fetch(sheet_server.url())
+	assert sheet_server.requests[-1][1]["If-None-Match"] == '"v2"'
+
+def test_connections_are_reused(sheet_server, fetcher):
+	sheet_server.body = SHEET
+	for _ in range(3):
+		fetcher.fetch(sheet_server.url("/redirect"))
+	assert len(sheet_server.requests) == 6
+	assert len(sheet_server.connections) == 1
+
+def test_error_status(sheet_server, fetcher):
+	with pytest.raises(OSError, match="404"):
+		fetcher.fetch(sheet_server.url("/missing"))
+
+def test_invalid_url(fetcher):
+	with pytest.raises(ValueError):
+		fetcher.fetch("ftp://example.com/sheet.csv")
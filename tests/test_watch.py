@@ -0,0 +1,34 @@
+import numpy as np
+import tabulator
+from watch import ElectionWatcher
+
+def test_rows_appended_to_header_only_sheet(sheet_server, monkeypatch):
+	# a Google export of a fresh response sheet is only its header row, without a line break
+	monkeypatch.setattr(tabulator, "resolve_source", lambda file_or_url: file_or_url)
+	sheet_server.body = b"Timestamp,A,B,C"
+	watcher = ElectionWatcher(sheet_server.url())
+
+	result = watcher.poll()
+	assert result is not None and result["quota"] == 0
+	assert watcher.election.scores.shape == (0, 3)
+
+	sheet_server.body += b"\r\nt,5,0,0\r\nt,0,5,0"
+	watcher.poll()
+	assert watcher.election.names == ["A", "B", "C"]
+	assert np.array_equal(watcher.election.scores, [[5, 0, 0], [0, 5, 0]])
+
+def test_rows_appended_to_header_only_file(tmp_path):
+	path = tmp_path / "responses.csv"
+	path.write_bytes(b"Timestamp,A,B,C")
+	watcher = ElectionWatcher(str(path))
+
+	assert watcher.poll() is None # the header row may still be being written
+	assert watcher.poll() is not None
+	assert watcher.election.scores.shape == (0, 3)
+
+	with open(path, "ab") as f:
+		f.write(b"\r\nt,5,0,0\r\nt,0,5,0")
+	watcher.poll() # the last row is only taken once the file stops growing
+	assert np.array_equal(watcher.election.scores, [[5, 0, 0]])
+	watcher.poll()
+	assert np.array_equal(watcher.election.scores, [[5, 0, 0], [0, 5, 0]])
@@ -0,0 +1,279 @@
+import numpy as np
+import classes
+import math
+import random
+
+def compute_ns(weights: np.ndarray, masks: np.ndarray, quota: float, counts: np.ndarray | None = None) -> np.ndarray:
+	'''
+	Batched counterpart of `tabulator.compute_n`, solving n exactly for every ballot set at once from sorted prefix sums.
+	With fixed-point weights, n is rounded down, so the sum of min(w, n) never exceeds the quota.
+	:param weights: The weight vector of all ballots, either float64 or fixed-point int64 (see `classes.WEIGHT_SCALE`).
+	:param masks: A boolean matrix of shape (ballots, sets), where each column marks the ballots of one set.
+	:param quota: The value of one quota, scaled like `weights`.
+	:param counts: How many identical ballots each row stands for, one each if not given.
+	:returns: A vector with the value of n for each set, or `quota` for sets that do not add up to one quota.
+	'''
+
+	n_ballots, n_sets = masks.shape
+	if n_ballots == 0:
+		return np.full(n_sets, quota) # no ballot set adds up to anything, and `argmax` below needs at least one row
+
+	fixed_point = weights.dtype.kind == "i"
+	blank = np.iinfo(weights.dtype).max if fixed_point else np.inf
+	keyed = np.where(masks, weights[:, None], blank)
+	if counts is None:
+		sorted_weights = np.sort(keyed, axis=0)
+		sorted_counts = (sorted_weights != blank).astype(np.int64)
+	else:
+		# a stable sort keeps equal weights in ballot order, like the sort in `compute_n`, which exact fixed-point sums do not need
+		order = np.argsort(keyed, axis=0, kind=None if fixed_point else "stable")
+		sorted_weights = np.take_along_axis(keyed, order, axis=0)
+		sorted_counts = np.where(sorted_weights != blank, counts[order], 0)
+
+	# exclusive prefix sums, accumulated in the same order as `compute_n` so both engines agree bit for bit
+	prefix = np.zeros((n_ballots + 1, n_sets), dtype=weights.dtype)
+	np.cumsum(np.where(sorted_weights != blank, sorted_weights, 0) * sorted_counts, axis=0, out=prefix[1:])
+
+	remaining = sorted_counts.sum(axis=0)[None, :] - (np.cumsum(sorted_counts, axis=0) - sorted_counts)
+	if fixed_point:
+		# the exact n of a set lies within the first weight for which `prefix + w * remaining` reaches the quota, which a rounded down n cannot tell
+		ns = (quota - prefix[:-1]) // np.maximum(remaining, 1)
+		solved = (remaining > 0) & (quota - prefix[:-1] <= sorted_weights * remaining)
+	else:
+		with np.errstate(divide="ignore", invalid="ignore"):
+			ns = (quota - prefix[:-1]) / remaining
+		solved = (remaining > 0) & (ns <= sorted_weights)
+	first = solved.argmax(axis=0)
+	return np.where(solved.any(axis=0), ns[first, np.arange(n_sets)], quota)
+
+def break_ties(tied: np.ndarray, scores: np.ndarray, weights: np.ndarray, threshold: int, stats: classes.TabulationStats | None = None, counts: np.ndarray | None = None) -> int | None:
+	'''
+	Runs the tie breaking chain of `tabulator` (threshold weight sum, weighted scores, unweighted scores) over column indices.
+	:param tied: The column indices of the tied candidates.
+	:param scores: The score matrix of the election.
+	:param weights: The weight vector of all ballots.
+	:param threshold: The current threshold.
+	:param stats: If given, counts each breaker invoked under the name of its `tabulator` counterpart.
+	:param counts: How many identical ballots each row stands for, one each if not given.
+	:returns: The column index of the succeeding candidate, or `None` if tie-breaking has failed.
+	'''
+
+	aggregates = classes.TieBreakAggregates(scores, weights, tied.tolist(), threshold, counts)
+
+	for kind in classes.TieBreakAggregates.KINDS:
+		if stats:
+			stats.count_tie_break(f"break_{kind}")
+		sums = np.array(aggregates.lookup(kind, tied.tolist()))
+		tied = tied[sums == sums.max()]
+		if len(tied) <= 1:
+			return int(tied[0])
+
+	if stats:
+		stats.count_tie_break("random")
+	return None
+
+def _tally(weights: np.ndarray, above: np.ndarray) -> np.ndarray:
+	# a C-ordered product is reduced row by row, summing in the same order as `classes.ThresholdTally.rebuild`
+	products = np.multiply(weights[:, None], above, order="C")
+	if products.shape[1] == 1 and len(products) > 0:
+		return np.cumsum(products, axis=0)[-1] # a single column would be reduced pairwise instead
+	return products.sum(axis=0)
+
+def _reweight(weights: np.ndarray, counts: np.ndarray, totals: np.ndarray, scores: np.ndarray | classes.SparseScores, threshold: int, rows: np.ndarray, new_weights: np.ndarray) -> tuple[np.ndarray, list[int]]:
+	# sets the weights of the ballots in `rows`, then sums the threshold tallies they changed again, and returns those columns, like `classes.ThresholdTally.reweight`
+	changed = weights[rows] != new_weights
+	weights[rows] = new_weights
+	sparse = isinstance(scores, classes.SparseScores)
+	touched = scores.columns_at(rows[changed], threshold) if sparse else np.flatnonzero((scores[rows[changed]] >= threshold).any(axis=0)).tolist()
+	if not touched:
+		return totals, touched
+
+	totals = totals.copy()
+	if sparse:
+		totals[touched] = scores.tally_columns(weights * counts, threshold, touched)
+	else:
+		totals[touched] = _tally(weights * counts, scores[:, touched] >= threshold)
+	return totals, touched
+
+def _unscale(weights: np.ndarray, fixed_point: bool) -> np.ndarray:
+	# the weights as recorded into rounds, which are always floats
+	return weights / classes.WEIGHT_SCALE if fixed_point else weights
+
+def tabulate_matrix(names: list[str], scores: np.ndarray, stats: classes.TabulationStats | None = None, rng: random.Random | None = None, counts: np.ndarray | None = None, fixed_point: bool = False):
+	'''
+	Array-backed tabulation engine, keeping the election as a dense score matrix and a weight vector, run step by step by `tabulator.tabulate_iter`.
+	:param names: The candidate names, one for each column of `scores`.
+	:param scores: A matrix of shape (ballots, candidates) with blank scores filled in as 0.
+	:param stats: If given, filled in with per-phase and per-round timings and hot path counters.
+	:param rng: The random generator used when tie-breaking fails, the `random` module itself if not given.
+	:param counts: How many identical ballots each row of `scores` stands for, one each if not given (see `tabulator.group_ballots`).
+	:param fixed_point: Whether to keep the weights as int64 multiples of `1 / classes.WEIGHT_SCALE`. Their sums are then exact, so results no longer depend on the order ballots are summed in, and n and the quota are rounded down to a multiple, so an election never removes more than one quota.
+	:returns: A generator yielding `(rounds, quota, seats)` once the zero round is recorded, then `None` after each further round is recorded into `rounds`.
+	'''
+
+	choice = rng.choice if rng else random.choice
+
+	store = classes.BallotStore(names, scores, counts, fixed_point)
+	scores = store.scores
+	sparse = store.sparse
+	weights = store.weights
+	counts = store.counts
+	candidates = store.candidates
+	n_candidates = scores.shape[1]
+	n_ballots = int(counts.sum())
+
+	elected: list[int] = []
+	is_elected = np.zeros(n_candidates, dtype=bool)
+	threshold = 5
+
+	elected_seats = min(math.floor(3.5 + n_ballots / 11), 40)
+	quota = n_ballots / elected_seats
+	seats = elected_seats
+
+	if fixed_point:
+		if 5 * n_ballots * classes.WEIGHT_SCALE > np.iinfo(np.int64).max:
+			raise ValueError(f"Too many ballots for fixed-point weights: {n_ballots}")
+		limit = n_ballots * classes.WEIGHT_SCALE // elected_seats # rounded down like n, so a last seat holding exactly the remaining quota is still reached
+	else:
+		limit = quota
+
+	rounds = classes.RoundHistory(candidates, _unscale(sparse.tally(weights * counts, threshold) if sparse else _tally(weights * counts, scores >= threshold), fixed_point), threshold)
+
+	if stats:
+		stats.lap("setup")
+
+	yield rounds, quota, seats
+
+	def ballots_at(column: int) -> np.ndarray:
+		# the rows of the ballots scoring a column at or above the threshold
+		return sparse.column_at(column, threshold) if sparse else np.flatnonzero(above[:, column])
+
+	def solve(columns: list[int]) -> list[float]:
+		if sparse:
+			ballot_sets = [ballots_at(j) for j in columns]
+			if stats:
+				stats.compute_n_calls += len(columns)
+				stats.compute_n_ballots += sum(len(rows) for rows in ballot_sets)
+			return [compute_ns(weights[rows], np.ones((len(rows), 1), dtype=bool), limit, counts[rows]).item() for rows in ballot_sets]
+
+		if stats:
+			stats.compute_n_calls += len(columns)
+			stats.compute_n_ballots += int(above[:, columns].sum())
+		return compute_ns(weights, above[:, columns], limit, counts).tolist()
+
+	while threshold > 0:
+		above = None if sparse else scores >= threshold
+		totals = sparse.tally(weights * counts, threshold) if sparse else _tally(weights * counts, above)
+		ns = classes.NValueQueue(solve)
+		thresholded = np.flatnonzero((totals >= limit) & ~is_elected)
+
+		if stats:
+			stats.lap("threshold")
+
+		while len(thresholded) > 0:
+			if stats:
+				stats.begin_round()
+
+			n = ns.minimum(thresholded.tolist())
+
+			if stats:
+				stats.lap("compute_n")
+
+			if len(n) > 1:
+				i, n_val = choice(n)
+				res = break_ties(thresholded[[i for (i, _) in n]], scores, weights, threshold, stats, counts)
+				if res is not None:
+					i, n_val = next((i, val) for (i, val) in n if thresholded[i] == res)
+			else:
+				i, n_val = n[0]
+
+			if stats:
+				stats.lap("tie_break")
+
+			round_weights = totals
+
+			# mirrors the reweighing set of the python engine, which indexes `candidates` by the position in `thresholded`
+			ballot_set = ballots_at(thresholded[i])
+			reweighing = [candidates[i]] if n_candidates > 1 and len(ballot_set) > 0 and not is_elected[i] else []
+
+			totals, touched = _reweight(weights, counts, totals, sparse or scores, threshold, ballot_set, weights[ballot_set] - np.minimum(weights[ballot_set], n_val))
+			ns.invalidate(touched)
+
+			if stats:
+				stats.ballots_reweighted += len(ballot_set)
+				stats.lap("reweight")
+
+			candidate = int(thresholded[i])
+			elected_seats -= 1
+			if not is_elected[candidate]:
+				elected.append(candidate)
+				is_elected[candidate] = True
+
+			if len(reweighing) > 0:
+				rounds.record(_unscale(round_weights, fixed_point), threshold, reweighing=[c.column for c in reweighing])
+				yield
+			rounds.record(_unscale(round_weights, fixed_point), threshold, elected=candidate)
+			yield
+
+			if stats:
+				stats.lap("history")
+
+			thresholded = np.flatnonzero((totals >= limit) & ~is_elected)
+
+			if stats:
+				stats.lap("threshold")
+				stats.end_round()
+
+		threshold -= 1
+
+	# `totals` was left at a threshold of 1, so it covers every positive score
+	non_elected = np.flatnonzero(~is_elected)
+	while elected_seats > 0 and len(non_elected) > 0:
+		if stats:
+			stats.begin_round()
+
+		sums = totals[non_elected].tolist()
+		max_sum = max(sums)
+		weight = [i for (i, w) in enumerate(sums) if w == max_sum]
+
+		if stats:
+			stats.lap("threshold")
+
+		if len(weight) > 1:
+			i = choice(weight)
+			res = break_ties(non_elected[weight], scores, weights, threshold, stats, counts)
+			if res is not None:
+				i = int(np.flatnonzero(non_elected == res)[0])
+		else:
+			i = weight[0]
+
+		if stats:
+			stats.lap("tie_break")
+
+		candidate = int(non_elected[i])
+		ballot_set = sparse.column_at(candidate, 1) if sparse else np.flatnonzero(scores[:, candidate] >= 1)
+
+		round_weights = _unscale(totals, fixed_point).copy()
+		total_weight = _tally(weights * counts, np.ones((len(weights), 1), dtype=bool))[0]
+		round_weights[elected] = int(total_weight) / classes.WEIGHT_SCALE if fixed_point else total_weight
+
+		reweighing = [candidates[i]] if n_candidates > 1 and len(ballot_set) > 0 and not is_elected[i] else []
+		totals, _ = _reweight(weights, counts, totals, sparse or scores, 1, ballot_set, np.zeros(len(ballot_set), dtype=weights.dtype))
+
+		if stats:
+			stats.ballots_reweighted += len(ballot_set)
+			stats.lap("reweight")
+
+		elected_seats -= 1
+		if not is_elected[candidate]:
+			elected.append(candidate)
+			is_elected[candidate] = True
+
+		non_elected = np.flatnonzero(~is_elected)
+
+		rounds.record(round_weights, threshold, elected=candidate, reweighing=[c.column for c in reweighing])
+		yield
+
+		if stats:
+			stats.lap("history")
+			stats.end_round()
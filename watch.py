@@ -0,0 +1,135 @@
+import argparse
+import classes
+import hashlib
+import numpy as np
+import os
+import random
+import tabulator
+import time
+
+DEFAULT_INTERVAL = 30 # seconds between polls
+
+class ElectionWatcher:
+	'''
+	Follows a spreadsheet that only grows, such as a Google Form response sheet, and keeps a provisional result for it.
+	The validated score matrix is kept between polls, so only appended rows are parsed and validated. Any other change to the spreadsheet, such as an edited or deleted row, reloads it from scratch.
+	'''
+
+	def __init__(self, file_or_url: str, engine: str = "numpy", seed: int = 0):
+		'''
+		:param file_or_url: The filename or Google Sheets document link of the spreadsheet.
+		:param engine: The tabulation engine to use, one of `tabulator.ENGINES`.
+		:param seed: Seeds the random tie fallbacks of every tabulation, so the result only changes when the ballots do.
+		'''
+
+		self.source = tabulator.resolve_source(file_or_url)
+		self.engine = engine
+		self.seed = seed
+		self.election: classes.BallotMatrix | None = None
+		self.result: dict | None = None
+
+		self._header = b""
+		self._consumed = 0 # bytes of the spreadsheet ingested so far, always whole lines
+		self._digest = b""
+		self._size = -1
+		self._buffer = np.empty((0, 0), dtype=np.int8) # grown geometrically, `election.scores` is a view of its filled rows
+		self._rows = 0
+
+	def _read(self) -> tuple[bytes, int]:
+		# returns the contents and how much of them is safe to ingest: a local file may be caught halfway through writing a row
+		if not os.path.exists(self.source):
+			content = tabulator.fetch_csv(self.source)
+			return content, len(content)
+
+		with open(self.source, "rb") as f:
+			content = f.read()
+
+		# a last row without a line break is only taken once the file has stopped growing
+		size, self._size = self._size, len(content)
+		if content.endswith(b"\n") or size == len(content) or tabulator.is_binary_election(content):
+			return content, len(content)
+		return content, content.rfind(b"\n") + 1
+
+	def _reload(self, content: bytes):
+		election = tabulator.load_election(content)
+		self._buffer = np.array(election.scores, dtype=np.int8) # the loaded matrix may be a read-only mapping
+		self._rows = len(self._buffer)
+		# a sheet holding only its header row has no line break yet, which the rows appended to it need to be parsed after a copy of it
+		line_end = content.find(b"\n")
+		self._header = content + b"\n" if line_end < 0 else content[:line_end + 1]
+		self.election = classes.BallotMatrix(election.names, self._buffer, self.source)
+
+	def _append(self, scores: np.ndarray):
+		rows = self._rows + len(scores)
+		if rows > len(self._buffer):
+			buffer = np.empty((max(rows, 2 * len(self._buffer)), scores.shape[1]), dtype=np.int8)
+			buffer[:self._rows] = self._buffer[:self._rows]
+			self._buffer = buffer
+
+		self._buffer[self._rows:rows] = scores
+		self._rows = rows
+		self.election = classes.BallotMatrix(self.election.names, self._buffer[:rows], self.source)
+
+	def poll(self) -> dict | None:
+		'''
+		Ingests whatever was appended to the spreadsheet since the last poll and tabulates it again.
+		Invalid rows raise a `ValueError` and are not ingested, so the next poll retries them.
+		:returns: The result of `tabulator.tabulate` if the quota, seats or elected candidates changed, otherwise `None`.
+		'''
+
+		content, end = self._read()
+		if end == 0:
+			return None # not even the header row is complete yet
+
+		view = memoryview(content)
+		prefix = hashlib.sha256(view[:min(self._consumed, end)])
+		digest = prefix.copy()
+		digest.update(view[min(self._consumed, end):end])
+		if self.election is not None and digest.digest() == self._digest:
+			return None
+
+		appended = (
+			self.election is not None
+			and end > self._consumed
+			and prefix.digest() == self._digest
+			and not tabulator.is_binary_election(content)
+		)
+
+		if appended:
+			# the first new row may follow the line break the last row was missing, if it was the end of a downloaded sheet
+			rows = content[self._consumed:end].lstrip(b"\r\n")
+			if rows:
+				self._append(tabulator.load_election(self._header + rows, first_row=self._rows).scores)
+		else:
+			self._reload(content[:end])
+
+		self._consumed = end
+		self._digest = digest.digest()
+
+		result = tabulator.tabulate(self.election, self.engine, rng=random.Random(self.seed))
+		summary = lambda data: (data["quota"], data["seats"], [c.column for c in data["rounds"].elected])
+		if self.result is not None and summary(self.result) == summary(result):
+			self.result = result
+			return None
+
+		self.result = result
+		return result
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Follows a growing TEA response spreadsheet, printing a provisional result whenever it changes.")
+	parser.add_argument("file_or_url", help="the spreadsheet file or URL")
+	parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="seconds between polls")
+	parser.add_argument("--engine", choices=tabulator.ENGINES, default="numpy")
+	parser.add_argument("--seed", type=int, default=0, help="seed for the random tie fallbacks")
+	args = parser.parse_args()
+
+	watcher = ElectionWatcher(args.file_or_url, args.engine, args.seed)
+	while True:
+		try:
+			if (result := watcher.poll()):
+				print(f"===== {time.strftime('%H:%M:%S')} | {len(watcher.election.scores)} ballots | quota = {result['quota']:.6f}, seats = {result['seats']} =====")
+				print("\n".join('- ' + candidate.name for candidate in result["rounds"].elected))
+		except (OSError, ValueError) as e:
+			print(f"===== {time.strftime('%H:%M:%S')} | not updated =====\n{e}")
+
+		time.sleep(args.interval)